@@ -1,12 +1,17 @@
 import numpy as np
 import pygame
 
+from spatial_hash import SpatialHash
+from integrators import get_integrator
+from instrumentation import debug
+
 
 class BoidIntegrator:
 
     
 
-    def __init__(self, screen, x_star, N=5, M =5, k_sep=1, k_coh=1, k_align=1, col=(233, 10, 10)):
+    def __init__(self, screen, x_star, N=5, M =5, k_sep=1, k_coh=1, k_align=1, col=(233, 10, 10),
+                 integrator="semi_implicit", substeps=1):
         self.rng = np.random.default_rng()
         self.N = N
         self.M = M
@@ -33,54 +38,58 @@ class BoidIntegrator:
 
         self.Y = None
 
+        self.neighbor_search = SpatialHash(self.range)
+
+        self.integrator = get_integrator(integrator)
+        self.substeps = substeps
+
 
     def update(self, dt, x_star):
+        self.integrator.step_inplace(self.X, self.X_dot, lambda X, X_dot: self.acceleration(X, X_dot, x_star),
+                                     dt, self.substeps)
 
+    def acceleration(self, X, X_dot, x_star):
+        """
+        Compute the flock's acceleration at positions X and velocities X_dot.
+        """
         A_align = np.zeros((self.N,2))
         A_coh = np.zeros((self.N,2))
         A_sep = np.zeros((self.N,2))
 
-        self.X_mean = np.mean(self.X, axis=0)
-        self.V_mean = np.mean(self.X_dot, axis=0)
-
-        R_XX = self.X[:, np.newaxis, :] - self.X[np.newaxis, :, :]
-        D_X = np.linalg.norm(R_XX, axis=2)
-        np.fill_diagonal(D_X, 1e-5)
+        ## Neighbours within range, from the spatial hash instead of all N^2 pairs
+        i, j, R_ij = self.neighbor_search.build(X).pairs()
+        N_x = np.bincount(i, minlength=self.N) + 1  # Each boid counts itself
 
-        R_Xdot = self.X_dot[:, np.newaxis] - self.X_dot[np.newaxis, :, :]
-        
-        Nx_mask = D_X < self.range
-        N_x = np.sum(Nx_mask, axis=1)
-        
+        # Per-boid means over its neighbourhood (itself included)
+        self.X_mean = X.copy()
+        self.V_mean = X_dot.copy()
+        for k in range(2):
+            self.X_mean[:, k] += np.bincount(i, weights=X[j, k], minlength=self.N)
+            self.V_mean[:, k] += np.bincount(i, weights=X_dot[j, k], minlength=self.N)
+        self.X_mean /= N_x[:, np.newaxis]
+        self.V_mean /= N_x[:, np.newaxis]
+        D2_sum = np.bincount(i, weights=np.einsum("ij,ij->i", R_ij, R_ij), minlength=self.N)
 
         ## Flocking Mechanics
-        A_sep = 10 * np.einsum("i,ij->ij", (1/np.sum(D_X.dot(D_X), axis=0) ), self.X - self.X_mean)
-        A_coh = 1* self.k_coh * self.V_mean - self.X_dot
-        A_align = 1* self.k_align * self.X_mean - self.X
+        # Separation over in-range neighbours only; a boid with none feels no push.
+        has_neighbors = (N_x > 1)[:, np.newaxis]
+        A_sep = np.where(has_neighbors, 10 * self.k_sep * (X - self.X_mean) / (D2_sum[:, np.newaxis] + 1e-5), 0)
+        A_coh = 1* self.k_coh * self.V_mean - X_dot
+        A_align = 1* self.k_align * self.X_mean - X
 
-        print("Acoh = ", A_coh)
-        print("Aalign = ", A_align)
+        debug("Acoh = ", A_coh)
+        debug("Aalign = ", A_align)
 
         if x_star is not None:
-            A_fol = 0.5*(x_star - self.X)
+            A_fol = 0.5*(x_star - X)
         else:
             A_fol = 0
 
         self.X_ddot = A_fol + A_align + A_coh + A_sep
 
         # self.enforce_speed_limit()
-       
-        self.X, self.X_dot = self.EulerIntergrate(self.X, self.X_dot, self.X_ddot, dt)
-        
-
-
-    def EulerIntergrate(self, x, v, a, dt):
-        v += a*dt
-        x += v*dt
-
-        # print(x)
 
-        return (x,v)
+        return self.X_ddot
 
 
     def draw(self):
@@ -152,7 +161,7 @@ class BoidIntegrator:
         self.X_ddot[self.lead_indx] = np.array(v)
 
     def elementwise_dot(self, V, M):
-        print("M shape= ", M.shape)
+        debug("M shape= ", M.shape)
         out = np.zeros(M.shape)
         for i in range(0, M.shape[1]):
             for j in range(0, M.shape[0]):
@@ -44,4 +44,129 @@ class Projectile:
 
     def draw(self):
 
-        pygame.draw.rect(self.screen, (220, 180, 140), (self.positions[0]%self.screen.get_width() , self.positions[1]%self.screen.get_height() , 7, 7)) #%self.screen.get_height(), %self.screen.get_width()
\ No newline at end of file
+        pygame.draw.rect(self.screen, (220, 180, 140), (self.positions[0]%self.screen.get_width() , self.positions[1]%self.screen.get_height() , 7, 7)) #%self.screen.get_height(), %self.screen.get_width()
+
+class ProjectilePool:
+    def __init__(self, screen, capacity=65536, velocity=1000, life_time=0.2, color=(220, 180, 140), size=7):
+        """
+        Fixed-capacity store of projectiles, updated and drawn in batch.
+
+        Live projectiles occupy the first `count` rows of preallocated position,
+        direction, lifetime and team arrays; expired ones are compacted away.
+
+        Parameters:
+        - screen (pygame.Surface): Surface the projectiles are drawn on.
+        - capacity (int): Most projectiles alive at once; extra spawns are dropped.
+        - velocity (float): Speed of each projectile.
+        - life_time (float): Seconds a projectile lives for, whatever the update rate.
+        - color (tuple): Projectile colour.
+        - size (int): Side of the square drawn for each projectile, in pixels.
+        """
+        self.screen = screen
+        self.capacity = capacity
+        self.velocity = velocity
+        self.life_time = life_time
+        self.color = np.array(color, dtype=np.uint8)
+        self.size = size
+
+        self.positions = np.zeros((capacity, 2))
+        self.directions = np.zeros((capacity, 2))
+        self.lives = np.zeros(capacity)  # Seconds left
+        self.team_idx = np.zeros(capacity, dtype=np.int32)
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def spawn(self, initial_positions, directions, team_idx=0):
+        """
+        Fire a batch of projectiles.
+
+        Parameters:
+        - initial_positions (ndarray): Positions of shape (N, 2) or (2,).
+        - directions (ndarray): Directions of shape (N, 2) or (2,), normalized here.
+        - team_idx (int or ndarray): Team of the shooter(s).
+
+        Returns:
+        - n (int): Number of projectiles actually spawned.
+        """
+        initial_positions = np.atleast_2d(initial_positions)
+        directions = np.atleast_2d(directions)
+        n = min(len(initial_positions), self.capacity - self.count)
+        new = slice(self.count, self.count + n)
+        norms = np.linalg.norm(directions[:n], axis=1, keepdims=True)
+        self.positions[new] = initial_positions[:n]
+        self.directions[new] = directions[:n] / np.where(norms > 0, norms, 1)
+        self.lives[new] = self.life_time
+        self.team_idx[new] = np.broadcast_to(team_idx, len(initial_positions))[:n]
+        self.count += n
+        return n
+
+    def get_state(self):
+        """
+        Return the live projectiles as arrays, for checkpoints.
+        """
+        live = slice(0, self.count)
+        return {
+            "positions": self.positions[live].copy(),
+            "directions": self.directions[live].copy(),
+            "lives": self.lives[live].copy(),
+            "team_idx": self.team_idx[live].copy(),
+        }
+
+    def set_state(self, state):
+        """
+        Replace the live projectiles with a `get_state` result, dropping any beyond capacity.
+        """
+        n = min(len(state["positions"]), self.capacity)
+        for name in ("positions", "directions", "lives", "team_idx"):
+            getattr(self, name)[:n] = state[name][:n]
+        self.count = n
+
+    def update(self, dt=1/30):
+        """
+        Move every live projectile and drop the ones whose lifetime ran out.
+
+        Parameters:
+        - dt (float): Time step for integration.
+        """
+        live = slice(0, self.count)
+        self.positions[live] += self.directions[live] * (self.velocity * dt)
+        self.lives[live] -= dt
+        self.kill(np.flatnonzero(self.lives[live] <= 0))
+
+    def kill(self, indices):
+        """
+        Remove the projectiles at the given indices, keeping the rest packed.
+        """
+        if len(indices) == 0:
+            return
+        alive = np.ones(self.count, dtype=bool)
+        alive[indices] = False
+        k = int(alive.sum())
+        for array in (self.positions, self.directions, self.lives, self.team_idx):
+            array[:k] = array[:self.count][alive]
+        self.count = k
+
+    def draw(self):
+        """
+        Draw every live projectile by writing its square straight into the screen's pixels.
+
+        The squares are rasterized as a screen-sized mask (corners, then widened
+        by `size` along each axis), so the cost does not grow with the count.
+        """
+        if self.count == 0:
+            return
+        width, height = self.screen.get_width(), self.screen.get_height()
+        corners = np.zeros((width, height), dtype=bool)
+        corners[(self.positions[:self.count, 0] % width).astype(np.intp),
+                (self.positions[:self.count, 1] % height).astype(np.intp)] = True
+        mask = corners.copy()
+        for k in range(1, self.size):
+            mask[k:] |= corners[:-k]
+        corners = mask.copy()
+        for k in range(1, self.size):
+            mask[:, k:] |= corners[:, :-k]
+        pixels = pygame.surfarray.pixels3d(self.screen)
+        pixels[mask] = self.color
+        del pixels  # Unlock the surface
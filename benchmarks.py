@@ -0,0 +1,273 @@
+# benchmarks.py
+
+import argparse
+import json
+import os
+import platform
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")  # Render to offscreen surfaces, no window
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")  # Keep stdout pure JSON
+
+import numpy as np
+import pygame
+
+from game_logic import CompetitiveGameOfLife, ENGINES
+from headless import run as run_headless, seed_board
+from flock_engine import FlockEngine
+from BoidIntegrator import BoidIntegrator
+from Projectile import ProjectilePool
+
+SUITES = ("grid", "flock", "projectiles", "render")
+FLOCK_IMPLEMENTATIONS = ("engine", "integrator")
+
+# Area per boid for a density of about 20 neighbours in range, whatever N is.
+BOID_AREA = np.pi * 200 ** 2 / 20
+
+
+def timed(fn, repeat=5):
+    """
+    Call fn `repeat` times and return the best and median wall-clock durations.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return {"best": min(times), "median": float(np.median(times))}
+
+
+def bench_grid(sizes=(64, 256, 1024), engines=("numpy", "sparse"), generations=50, seed=0, density=0.3):
+    """
+    Measure generations per second of each engine on random boards of each size.
+
+    Parameters:
+        sizes (tuple): Side lengths of the square boards.
+        engines (tuple): Stepping engines of CompetitiveGameOfLife.
+        generations (int): Generations per run.
+        seed (int): Seed for the initial pattern and birth tie-breaks.
+        density (float): Fraction of live cells in the initial pattern.
+
+    Returns:
+        list: One record per (size, engine).
+    """
+    results = []
+    for size in sizes:
+        for engine in engines:
+            tie_break = "lowest" if engine == "hashlife" else None
+            result = run_headless(width=size, height=size, generations=generations, seed=seed,
+                                  density=density, engine=engine, tie_break=tie_break)
+            results.append({
+                "size": size,
+                "engine": engine,
+                "generations": result["generations"],
+                "elapsed": result["elapsed"],
+                "generations_per_second": result["generations_per_second"],
+                "cells_per_second": result["generations_per_second"] * size * size,
+            })
+    return results
+
+
+def _spread(X, rng):
+    """
+    Scatter boids uniformly over a square sized for a constant neighbour density.
+    """
+    X[:] = rng.random(X.shape) * np.sqrt(len(X) * BOID_AREA)
+
+
+def bench_flock(counts=(100, 1000, 5000), implementations=FLOCK_IMPLEMENTATIONS, steps=20, seed=0,
+                dt=1 / 60):
+    """
+    Measure boid steps per second for N boids split over two teams.
+
+    "engine" steps a FlockEngine holding both teams, "integrator" one
+    BoidIntegrator per team.
+
+    Parameters:
+        counts (tuple): Total numbers of boids.
+        implementations (tuple): Any of FLOCK_IMPLEMENTATIONS.
+        steps (int): Updates timed per run.
+        seed (int): Seed for boid positions and velocities.
+        dt (float): Time step per update.
+
+    Returns:
+        list: One record per (N, implementation).
+    """
+    screen = pygame.Surface((640, 480))
+    results = []
+    for N in counts:
+        for implementation in implementations:
+            rng = np.random.default_rng(seed)
+            if implementation == "engine":
+                flocks = FlockEngine(screen, seed=seed)
+                flocks.add_team(np.zeros(2), N=N // 2)
+                flocks.add_team(np.zeros(2), N=N - N // 2, col=(0, 0, 255))
+                _spread(flocks.X, rng)
+
+                def step():
+                    for _ in range(steps):
+                        flocks.update(dt)
+            elif implementation == "integrator":
+                teams = [BoidIntegrator(screen, np.zeros(2), N=n) for n in (N // 2, N - N // 2)]
+                for team in teams:
+                    team.rng = rng
+                    team.X_dot = rng.standard_normal(team.X_dot.shape) * 10
+                    _spread(team.X, rng)
+
+                def step():
+                    for _ in range(steps):
+                        for team in teams:
+                            team.update(dt, None)
+            else:
+                raise ValueError(f"Unknown flock implementation {implementation!r}, "
+                                 f"expected one of {FLOCK_IMPLEMENTATIONS}")
+            elapsed = timed(step, repeat=3)
+            results.append({
+                "boids": N,
+                "implementation": implementation,
+                "steps": steps,
+                "elapsed": elapsed,
+                "steps_per_second": steps / elapsed["best"],
+                "boid_steps_per_second": N * steps / elapsed["best"],
+            })
+    return results
+
+
+def bench_projectiles(counts=(1000, 10000, 65536), steps=100, seed=0, dt=1 / 60):
+    """
+    Measure ProjectilePool updates and draws per second for pools of each size.
+
+    Projectiles are given a lifetime longer than the run, so the pool stays full.
+
+    Parameters:
+        counts (tuple): Numbers of live projectiles.
+        steps (int): Updates timed per run.
+        seed (int): Seed for projectile positions and directions.
+        dt (float): Time step per update.
+
+    Returns:
+        list: One record per pool size.
+    """
+    screen = pygame.Surface((640, 480))
+    results = []
+    for count in counts:
+        rng = np.random.default_rng(seed)
+        pool = ProjectilePool(screen, capacity=count, life_time=10 ** 9)
+        pool.spawn(rng.random((count, 2)) * screen.get_size(), rng.standard_normal((count, 2)))
+
+        def step():
+            for _ in range(steps):
+                pool.update(dt)
+
+        update = timed(step, repeat=3)
+        draw = timed(pool.draw)
+        results.append({
+            "projectiles": count,
+            "steps": steps,
+            "update_elapsed": update,
+            "updates_per_second": steps / update["best"],
+            "projectile_updates_per_second": count * steps / update["best"],
+            "draw_seconds": draw["best"],
+        })
+    return results
+
+
+def bench_render(sizes=(64, 150, 512), cell_size=5, seed=0, density=0.3, generations=1):
+    """
+    Measure full and dirty-tile redraws of random boards onto an offscreen Surface.
+
+    The dirty redraw is timed after `generations` generations, the usual
+    amount of change between two frames.
+
+    Parameters:
+        sizes (tuple): Side lengths of the square boards.
+        cell_size (int): The size of each cell in pixels.
+        seed (int): Seed for the initial pattern and birth tie-breaks.
+        density (float): Fraction of live cells in the initial pattern.
+        generations (int): Generations stepped before each dirty redraw.
+
+    Returns:
+        list: One record per board size.
+    """
+    results = []
+    for size in sizes:
+        game = CompetitiveGameOfLife(width=size, height=size, engine="numpy", seed=seed, double_buffer=True)
+        seed_board(game, "random", density)
+        screen = pygame.Surface((size * cell_size, size * cell_size))
+        game.draw_grid(screen, cell_size)  # Allocate the renderer's surfaces
+        full = timed(lambda: game.draw_grid(screen, cell_size))
+
+        game.draw_dirty(screen, cell_size)
+        dirty = []
+        for _ in range(5):
+            game.advance(generations)
+            start = time.perf_counter()
+            game.draw_dirty(screen, cell_size)
+            dirty.append(time.perf_counter() - start)
+        game.close()
+        results.append({
+            "size": size,
+            "cell_size": cell_size,
+            "full_seconds": full["best"],
+            "dirty_seconds": min(dirty),
+            "full_frames_per_second": 1 / full["best"],
+        })
+    return results
+
+
+def run(suites=SUITES, seed=0, quick=False, engines=("numpy", "sparse")):
+    """
+    Run the selected benchmark suites.
+
+    Parameters:
+        suites (tuple): Any of SUITES.
+        seed (int): Seed shared by every suite.
+        quick (bool): Use small sizes, for a fast smoke run.
+        engines (tuple): Board engines for the grid suite.
+
+    Returns:
+        dict: Environment details and one list of records per suite.
+    """
+    pygame.init()
+    results = {
+        "seed": seed,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pygame": pygame.version.ver,
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+    if "grid" in suites:
+        results["grid"] = bench_grid(sizes=(32, 64) if quick else (64, 256, 1024), engines=engines,
+                                     generations=5 if quick else 50, seed=seed)
+    if "flock" in suites:
+        results["flock"] = bench_flock(counts=(50, 200) if quick else (100, 1000, 5000),
+                                       steps=3 if quick else 20, seed=seed)
+    if "projectiles" in suites:
+        results["projectiles"] = bench_projectiles(counts=(100, 1000) if quick else (1000, 10000, 65536),
+                                                   steps=5 if quick else 100, seed=seed)
+    if "render" in suites:
+        results["render"] = bench_render(sizes=(32, 64) if quick else (64, 150, 512), seed=seed)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the board, flocks, projectiles and rendering.")
+    parser.add_argument("--suites", nargs="+", choices=SUITES, default=list(SUITES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=["numpy", "sparse"],
+                        help="board engines for the grid suite")
+    parser.add_argument("--quick", action="store_true", help="small sizes, for a fast smoke run")
+    parser.add_argument("--output", "-o", default=None, help="also write the JSON to this file")
+    args = parser.parse_args(argv)
+
+    results = run(suites=tuple(args.suites), seed=args.seed, quick=args.quick, engines=tuple(args.engines))
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+# checkpoint.py
+
+import io
+import json
+import os
+import struct
+
+import numpy as np
+
+from game_logic import CompetitiveGameOfLife
+from rules import RuleSet
+
+MAGIC = b"GOLCKPT\0"
+VERSION = 1
+ENCODINGS = ("raw", "rle", "packed")
+
+# magic, version, encoding, height, width, generation, meta length,
+# grid offset, grid length, arrays offset, arrays length
+HEADER = struct.Struct("<8sHHIIQIQQQQ")
+ALIGNMENT = 64  # Grid payload offset, so raw grids can be memory-mapped in place
+
+
+def _align(n):
+    return -(-n // ALIGNMENT) * ALIGNMENT
+
+
+def _run_length_dtype(size):
+    return np.dtype("<u4") if size <= 0xFFFFFFFF else np.dtype("<u8")
+
+
+def encode_grid(grid, encoding="rle"):
+    """
+    Serialize a grid to bytes.
+
+    Parameters:
+        grid (ndarray): Cell types, shape (H, W).
+        encoding (str): "raw" stores the cells as they are (memory-mappable),
+                        "rle" as runs of equal cells in row-major order, and
+                        "packed" as bit planes, ceil(log2(types)) bits per cell.
+
+    Returns:
+        tuple: (payload bytes, dict of parameters needed to decode it).
+    """
+    flat = np.ascontiguousarray(grid).ravel()
+    top = int(flat.max()) if flat.size else 0
+    if encoding == "raw":
+        return memoryview(flat).cast("B"), {}
+    if encoding == "rle":
+        value_dtype = np.dtype("<u1") if top < 256 else flat.dtype.newbyteorder("<")
+        starts = np.concatenate(([0], np.flatnonzero(flat[1:] != flat[:-1]) + 1)) if flat.size else np.zeros(0, int)
+        lengths = np.diff(np.append(starts, flat.size))
+        payload = (struct.pack("<Q", len(starts)) + flat[starts].astype(value_dtype).tobytes()
+                   + lengths.astype(_run_length_dtype(flat.size)).tobytes())
+        return payload, {"value_dtype": value_dtype.str}
+    if encoding == "packed":
+        bits = max(top.bit_length(), 1)
+        planes = [np.packbits(((flat >> b) & 1).astype(bool)) for b in range(bits)]
+        return b"".join(plane.tobytes() for plane in planes), {"bits": bits}
+    raise ValueError(f"Unknown encoding {encoding!r}, expected one of {ENCODINGS}")
+
+
+def decode_grid(payload, encoding, shape, dtype, params):
+    """
+    Rebuild a grid from `encode_grid` output.
+    """
+    size = shape[0] * shape[1]
+    dtype = np.dtype(dtype)
+    if encoding == "raw":
+        return np.frombuffer(payload, dtype=dtype, count=size).reshape(shape).copy()
+    if encoding == "rle":
+        runs, = struct.unpack_from("<Q", payload)
+        value_dtype = np.dtype(params["value_dtype"])
+        values = np.frombuffer(payload, dtype=value_dtype, count=runs, offset=8)
+        lengths = np.frombuffer(payload, dtype=_run_length_dtype(size), count=runs,
+                                offset=8 + runs * value_dtype.itemsize)
+        return np.repeat(values.astype(dtype), lengths).reshape(shape)
+    if encoding == "packed":
+        plane_size = -(-size // 8)
+        planes = np.frombuffer(payload, dtype=np.uint8, count=plane_size * params["bits"])
+        grid = np.zeros(size, dtype=dtype)
+        for b in range(params["bits"]):
+            plane = np.unpackbits(planes[b * plane_size:(b + 1) * plane_size], count=size)
+            grid |= plane.astype(dtype) << b
+        return grid.reshape(shape)
+    raise ValueError(f"Unknown encoding {encoding!r}, expected one of {ENCODINGS}")
+
+
+def _split(extra, prefix=""):
+    """
+    Split a nested dict into arrays (keyed by "a/b" paths) and the JSON-able rest.
+    """
+    arrays, rest = {}, {}
+    for key, value in extra.items():
+        if isinstance(value, dict):
+            sub_arrays, rest[key] = _split(value, f"{prefix}{key}/")
+            arrays.update(sub_arrays)
+        elif isinstance(value, np.ndarray):
+            arrays[f"{prefix}{key}"] = value
+        else:
+            rest[key] = value
+    return arrays, rest
+
+
+def _join(rest, arrays):
+    """
+    Inverse of `_split`.
+    """
+    extra = json.loads(json.dumps(rest))
+    for path, value in arrays.items():
+        *parents, key = path.split("/")
+        node = extra
+        for parent in parents:
+            node = node.setdefault(parent, {})
+        node[key] = value
+    return extra
+
+
+class Checkpoint:
+    def __init__(self, grid, generation, meta, extra):
+        """
+        Saved simulation state, as read back by `Checkpoint.read`.
+
+        Parameters:
+            grid (ndarray): Cell types, shape (H, W). A memory map for raw
+                            checkpoints read with mmap=True.
+            generation (int): Generation the grid is at.
+            meta (dict): Board settings: cell_types, dtype, seed, tie_break,
+                         rules, engine and the RNG state.
+            extra (dict): Anything else saved alongside, e.g. flocks and projectiles.
+        """
+        self.grid = grid
+        self.generation = generation
+        self.meta = meta
+        self.extra = extra
+
+    @classmethod
+    def read(cls, path, mmap=False):
+        """
+        Read a checkpoint file.
+
+        Parameters:
+            path (str): Checkpoint file.
+            mmap (bool): Map a raw-encoded grid copy-on-write instead of reading
+                         it, so even huge boards load without copying; pages are
+                         only read (and copied when written) as they are touched.
+        """
+        with open(path, "rb") as f:
+            header = f.read(HEADER.size)
+            if len(header) < HEADER.size or header[:len(MAGIC)] != MAGIC:
+                raise ValueError(f"{path} is not a checkpoint")
+            (_, version, encoding, height, width, generation, meta_len,
+             grid_offset, grid_len, arrays_offset, arrays_len) = HEADER.unpack(header)
+            if version > VERSION:
+                raise ValueError(f"{path} is checkpoint version {version}, this reader handles {VERSION}")
+            meta = json.loads(f.read(meta_len))
+            encoding = ENCODINGS[encoding]
+            shape = (height, width)
+            if mmap and encoding == "raw":
+                grid = np.memmap(path, dtype=np.dtype(meta["dtype"]), mode="c", offset=grid_offset, shape=shape)
+            else:
+                f.seek(grid_offset)
+                grid = decode_grid(f.read(grid_len), encoding, shape, meta["dtype"], meta["encoding_params"])
+            arrays = {}
+            if arrays_len:
+                f.seek(arrays_offset)
+                with np.load(io.BytesIO(f.read(arrays_len)), allow_pickle=False) as npz:
+                    arrays = {key: npz[key] for key in npz.files}
+        return cls(grid, generation, meta, _join(meta.pop("extra", {}), arrays))
+
+
+def save(path, game, encoding="rle", extra=None):
+    """
+    Write the board, its generation and RNG state, and any extra state to a checkpoint file.
+
+    The file is written next to `path` and renamed over it, so an interrupted
+    save never leaves a half-written checkpoint behind.
+
+    Parameters:
+        path (str): Checkpoint file.
+        game (CompetitiveGameOfLife): The board to save.
+        encoding (str): Grid encoding, one of ENCODINGS ("raw" for memory-mapping).
+        extra (dict): Further state, nested dicts of arrays and JSON values.
+    """
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Unknown encoding {encoding!r}, expected one of {ENCODINGS}")
+    grid = np.ascontiguousarray(game.grid, dtype=game.grid.dtype.newbyteorder("<"))
+    payload, params = encode_grid(grid, encoding)
+    arrays, rest = _split(extra or {})
+
+    meta = {
+        "dtype": grid.dtype.str,
+        "cell_types": list(map(int, game.cell_types)),
+        "seed": int(game.seed),
+        "tie_break": game.tie_break,
+        "rules": {
+            "birth": game.rules.birth.tolist(),
+            "survival": game.rules.survival.tolist(),
+            "max_neighbor_types": game.rules.max_neighbor_types,
+        },
+        "engine": game.engine,
+        "rng": game.rng.bit_generator.state,
+        "encoding_params": params,
+        "extra": rest,
+    }
+    meta_bytes = json.dumps(meta).encode()
+    blob = b""
+    if arrays:
+        buffer = io.BytesIO()
+        np.savez(buffer, **arrays)
+        blob = buffer.getvalue()
+
+    grid_offset = _align(HEADER.size + len(meta_bytes))
+    arrays_offset = _align(grid_offset + len(payload))
+    header = HEADER.pack(MAGIC, VERSION, ENCODINGS.index(encoding), game.height, game.width,
+                         game.generation, len(meta_bytes), grid_offset, len(payload),
+                         arrays_offset if blob else 0, len(blob))
+
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(header)
+        f.write(meta_bytes)
+        f.seek(grid_offset)
+        f.write(payload)
+        if blob:
+            f.seek(arrays_offset)
+            f.write(blob)
+    os.replace(tmp, path)
+
+
+def restore(game, checkpoint):
+    """
+    Put a checkpoint's grid, generation and RNG state into an existing board of the same size.
+    """
+    if checkpoint.grid.shape != game.grid.shape:
+        raise ValueError(f"Checkpoint board is {checkpoint.grid.shape}, game board is {game.grid.shape}")
+    game.close()  # The parallel engine re-shares the new grid on its next step
+    grid = checkpoint.grid
+    if grid.dtype != game.dtype:
+        grid = grid.astype(game.dtype)
+    game.grid = grid
+    game.generation = checkpoint.generation
+    game.seed = checkpoint.meta["seed"]
+    game.rng.bit_generator.state = checkpoint.meta["rng"]
+    game.mark_all_active()
+
+
+def load(path, mmap=False, **game_kwargs):
+    """
+    Create a board from a checkpoint file.
+
+    Parameters:
+        path (str): Checkpoint file.
+        mmap (bool): Memory-map a raw-encoded grid, see `Checkpoint.read`.
+        **game_kwargs: Passed on to CompetitiveGameOfLife, overriding the saved
+                       engine, tie_break, rules and dtype.
+
+    Returns:
+        tuple: (CompetitiveGameOfLife, Checkpoint) with the checkpoint's extra state.
+    """
+    checkpoint = Checkpoint.read(path, mmap=mmap)
+    meta = checkpoint.meta
+    height, width = checkpoint.grid.shape
+    for key in ("engine", "tie_break", "dtype"):
+        if game_kwargs.get(key) is None:
+            game_kwargs[key] = meta[key]
+    if game_kwargs.get("rules") is None and "rules" in meta:
+        game_kwargs["rules"] = RuleSet(len(meta["cell_types"]), tie_break=game_kwargs.pop("tie_break"),
+                                       **meta["rules"])
+    game = CompetitiveGameOfLife(width=width, height=height, cell_types=meta["cell_types"],
+                                 seed=meta["seed"], **game_kwargs)
+    restore(game, checkpoint)
+    return game, checkpoint
@@ -0,0 +1,91 @@
+# collisions.py
+
+import numpy as np
+
+from spatial_hash import SpatialHash
+
+
+class CollisionSystem:
+    def __init__(self, box, hit_radius=8.5, projectile_size=7, boid_size=10):
+        """
+        Batch collision tests for a projectile pool on the toroidal screen.
+
+        Projectile-boid hits go through a uniform-grid broad phase over the
+        torus, so only projectiles and boids sharing a neighbourhood of cells are
+        compared. Projectile-cell hits need no broad phase: the board itself is
+        the grid, so each projectile looks up the one cell under it.
+
+        Parameters:
+        - box (tuple): (width, height) of the screen, which wraps around.
+        - hit_radius (float): Centre distance at which a projectile hits a boid.
+        - projectile_size (int): Side of a projectile's square, in pixels.
+        - boid_size (int): Side of a boid's square, in pixels.
+        """
+        self.box = np.asarray(box, dtype=float)
+        self.hit_radius = hit_radius
+        # Positions are top-left corners; compare the squares' centres.
+        self.offset = (projectile_size - boid_size) / 2
+        self.broad_phase = SpatialHash(hit_radius, box)
+
+    def projectile_boid_hits(self, pool, X, teams):
+        """
+        Find projectiles that hit a boid of another team.
+
+        Parameters:
+        - pool (ProjectilePool): The projectiles.
+        - X (ndarray): Boid positions of shape (N, 2).
+        - teams (ndarray): Team of each boid, shape (N,).
+
+        Returns:
+        - hits (tuple): (projectile, boid) index arrays, at most one boid per projectile.
+        """
+        P = pool.positions[:pool.count] + self.offset
+        i, j, _ = self.broad_phase.build(X).query(P)
+        enemy = pool.team_idx[i] != teams[j]
+        i, j = i[enemy], j[enemy]
+        i, first = np.unique(i, return_index=True)
+        return i, j[first]
+
+    def projectile_cell_hits(self, pool, grid, cell_size):
+        """
+        Find projectiles over a live cell of the board.
+
+        Parameters:
+        - pool (ProjectilePool): The projectiles.
+        - grid (ndarray): Board cells, shape (H, W).
+        - cell_size (int): The size of each cell in pixels.
+
+        Returns:
+        - hits (tuple): (projectile, x, y) arrays with the cell coordinates hit.
+        """
+        P = pool.positions[:pool.count] % self.box
+        xs = (P[:, 0] // cell_size).astype(np.intp)
+        ys = (P[:, 1] // cell_size).astype(np.intp)
+        on_board = (xs < grid.shape[1]) & (ys < grid.shape[0])
+        i = np.flatnonzero(on_board)
+        i = i[grid[ys[i], xs[i]] != 0]
+        return i, xs[i], ys[i]
+
+    def resolve(self, pool, flocks, game, cell_size, boids=True):
+        """
+        Apply this frame's hits: kill hit cells and remove every projectile that hit something.
+
+        Parameters:
+        - pool (ProjectilePool): The projectiles.
+        - flocks (FlockEngine): All boids, with their team ids.
+        - game (CompetitiveGameOfLife): The board.
+        - cell_size (int): The size of each cell in pixels.
+        - boids (bool): Whether projectiles can hit boids; False while they are hidden.
+
+        Returns:
+        - hits (ndarray): Number of boids hit, per boid team.
+        """
+        if boids:
+            hit_p, hit_b = self.projectile_boid_hits(pool, flocks.X, flocks.team)
+        else:
+            hit_p = hit_b = np.zeros(0, dtype=np.intp)
+        cell_p, xs, ys = self.projectile_cell_hits(pool, game.grid, cell_size)
+        if len(xs):  # Every edit costs the board worker a wake-up
+            game.clear_cells(xs, ys)
+        pool.kill(np.union1d(hit_p, cell_p))
+        return np.bincount(flocks.team[hit_b], minlength=len(flocks.colors))
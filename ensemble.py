@@ -0,0 +1,241 @@
+# ensemble.py
+
+import argparse
+import json
+import os
+import time
+from multiprocessing import Pool
+
+import numpy as np
+
+from game_logic import next_generation
+from headless import add_rule_arguments, rules_from_args
+from rules import standard_rules
+
+
+def random_boards(seeds, width, height, num_types, density=0.3, dtype=np.uint8):
+    """
+    Stack one random board per seed, each filled exactly as `headless.seed_board`
+    fills a CompetitiveGameOfLife created with that seed.
+
+    Returns:
+        ndarray: Boards of shape (len(seeds), height, width).
+    """
+    grids = np.zeros((len(seeds), height, width), dtype=dtype)
+    for grid, seed in zip(grids, seeds):
+        rng = np.random.default_rng(seed)
+        cells = rng.integers(1, num_types, size=(height, width))
+        cells[rng.random((height, width)) >= density] = 0
+        grid[:] = cells
+    return grids
+
+
+class Ensemble:
+    def __init__(self, grids, seeds, rules=None, generation=0):
+        """
+        Many independent boards of one size, stepped together in one vectorized call.
+
+        The boards are stacked into a (B, H, W) array; each wraps around its own
+        edges and resolves birth ties with its own seed, so every board evolves
+        exactly as a CompetitiveGameOfLife with that seed would. Boards that die
+        out are dropped from the stack, since an empty board stays empty.
+
+        Parameters:
+            grids (ndarray): Initial boards, shape (B, H, W).
+            seeds (sequence): One seed per board.
+            rules (RuleSet): Rules shared by every board; the standard rules if None.
+            generation (int): Generation the boards are at.
+        """
+        if len(seeds) != len(grids):
+            raise ValueError(f"{len(grids)} boards but {len(seeds)} seeds")
+        self.rules = rules if rules is not None else standard_rules()
+        self.num_types = self.rules.num_types
+        self.seeds = np.asarray(seeds, dtype=np.uint64)
+        self.generation = generation
+        self.grids = np.asarray(grids)
+        self.size = self.grids.shape[1] * self.grids.shape[2]
+
+        count = len(self.grids)
+        self.populations = np.zeros((count, self.num_types), dtype=np.int64)
+        self.populations[:, 0] = self.size
+        # Generation each board (or each live type on it) first had no cells, -1 while it has some.
+        self.extinction = np.full(count, -1, dtype=np.int64)
+        self.type_extinction = np.full((count, self.num_types - 1), -1, dtype=np.int64)
+        self._boards = np.arange(count)  # Ensemble index of each board still in the stack
+        self._count()
+
+    def _count(self):
+        """
+        Update the populations and extinction times of the boards in the stack.
+        """
+        count = len(self.grids)
+        offsets = (np.arange(count) * self.num_types).reshape(-1, 1)
+        counts = np.bincount((self.grids.reshape(count, -1) + offsets).ravel(),
+                             minlength=count * self.num_types).reshape(count, self.num_types)
+        self.populations[self._boards] = counts
+
+        gone = (counts[:, 1:] == 0) & (self.type_extinction[self._boards] < 0)
+        boards, types = np.nonzero(gone)
+        self.type_extinction[self._boards[boards], types] = self.generation
+        empty = counts[:, 0] == self.size
+        self.extinction[self._boards[empty]] = self.generation
+        if empty.any():
+            alive = ~empty
+            self.grids = self.grids[alive]
+            self._boards = self._boards[alive]
+
+    @property
+    def alive(self):
+        """
+        Number of boards that still have live cells.
+        """
+        return len(self._boards)
+
+    def step(self):
+        """
+        Advance every board by one generation.
+        """
+        if len(self.grids):
+            padded = np.pad(self.grids, ((0, 0), (1, 1), (1, 1)), mode="wrap")
+            self.grids = next_generation(padded, self.num_types, self.seeds[self._boards], self.generation,
+                                         rules=self.rules)
+        self.generation += 1
+        self._count()
+
+    def advance(self, generations):
+        """
+        Step every board the given number of generations ahead, stopping early once all are empty.
+        """
+        for done in range(generations):
+            if not len(self.grids):
+                self.generation += generations - done
+                return
+            self.step()
+
+    def boards(self):
+        """
+        Return the full stack of boards, extinct ones included, shape (B, H, W).
+        """
+        grids = np.zeros((len(self.extinction),) + self.grids.shape[1:], dtype=self.grids.dtype)
+        grids[self._boards] = self.grids
+        return grids
+
+
+def _run_batch(task):
+    """
+    Seed and run one batch of boards, returning its final statistics.
+    """
+    seeds, width, height, generations, density, rules, dtype = task
+    ensemble = Ensemble(random_boards(seeds, width, height, rules.num_types, density, dtype), seeds, rules)
+    ensemble.advance(generations)
+    return ensemble.populations, ensemble.extinction, ensemble.type_extinction
+
+
+def run(seeds, width=64, height=64, generations=1000, density=0.3, rules=None, processes=None,
+        batch_size=64, dtype=np.uint8):
+    """
+    Run one random board per seed and collect how each one ended.
+
+    Boards are stepped in batches of `batch_size` stacked boards, and the
+    batches are spread over a pool of worker processes.
+
+    Parameters:
+        seeds (sequence): One seed per board, for its initial pattern and birth tie-breaks.
+        width (int): The width of every board.
+        height (int): The height of every board.
+        generations (int): Generations to run each board for.
+        density (float): Fraction of live cells in the initial patterns.
+        rules (RuleSet): Rules shared by every board; the standard rules if None.
+        processes (int): Worker processes, os.cpu_count() if None; 1 runs in this process.
+        batch_size (int): Boards stepped together per vectorized call.
+        dtype: Cell dtype of the boards.
+
+    Returns:
+        dict: "seeds", final "populations" (N, types), "extinction" (N,) and
+              "type_extinction" (N, types - 1) generations, -1 for survivors, and
+              the elapsed time.
+    """
+    if rules is None:
+        rules = standard_rules()
+    seeds = np.asarray(seeds, dtype=np.uint64)
+    if not len(seeds):
+        raise ValueError("An ensemble needs at least one seed")
+    tasks = [(seeds[i:i + batch_size], width, height, generations, density, rules, dtype)
+             for i in range(0, len(seeds), batch_size)]
+    processes = min(processes or os.cpu_count() or 1, max(len(tasks), 1))
+
+    start = time.perf_counter()
+    if processes == 1:
+        results = [_run_batch(task) for task in tasks]
+    else:
+        with Pool(processes) as pool:
+            results = pool.map(_run_batch, tasks)
+    elapsed = time.perf_counter() - start
+
+    populations, extinction, type_extinction = (np.concatenate(parts) for parts in zip(*results))
+    return {
+        "seeds": seeds,
+        "populations": populations,
+        "extinction": extinction,
+        "type_extinction": type_extinction,
+        "generations": generations,
+        "elapsed": elapsed,
+    }
+
+
+def summarize(result):
+    """
+    Return ensemble-wide statistics of a `run` result as a JSON-able dict.
+    """
+    extinction = result["extinction"]
+    extinct = extinction >= 0
+    runs = len(extinction)
+    return {
+        "runs": runs,
+        "generations": result["generations"],
+        "elapsed": result["elapsed"],
+        "board_generations_per_second": runs * result["generations"] / result["elapsed"]
+                                        if result["elapsed"] > 0 else float("inf"),
+        "extinct": int(extinct.sum()),
+        "median_extinction": float(np.median(extinction[extinct])) if extinct.any() else None,
+        "mean_population": result["populations"].mean(axis=0).tolist(),
+        "type_survival": (result["type_extinction"] < 0).mean(axis=0).tolist(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run many independent boards and summarize how they end.")
+    parser.add_argument("--runs", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first board, the rest count up")
+    parser.add_argument("--width", type=int, default=64)
+    parser.add_argument("--height", type=int, default=64)
+    parser.add_argument("--generations", "-n", type=int, default=1000)
+    parser.add_argument("--density", type=float, default=0.3)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=64, help="boards stepped together")
+    add_rule_arguments(parser)
+    parser.add_argument("--output", "-o", default=None, help="save per-board results to this .npz file")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args(argv)
+
+    result = run(np.arange(args.seed, args.seed + args.runs), width=args.width, height=args.height,
+                 generations=args.generations, density=args.density, rules=rules_from_args(args),
+                 processes=args.processes, batch_size=args.batch_size)
+    if args.output:
+        np.savez(args.output, **result)
+    summary = summarize(result)
+
+    if args.json:
+        print(json.dumps(summary))
+        return
+    print(f"{summary['runs']} boards of {args.width}x{args.height} for {summary['generations']} generations "
+          f"in {summary['elapsed']:.2f}s = {summary['board_generations_per_second']:.0f} board-gen/s")
+    print(f"  extinct: {summary['extinct']}"
+          + (f" (median at generation {summary['median_extinction']:.0f})" if summary["extinct"] else ""))
+    for cell_type, (population, survival) in enumerate(zip(summary["mean_population"][1:],
+                                                           summary["type_survival"]), start=1):
+        print(f"  type {cell_type}: mean population {population:.1f}, survives in {100 * survival:.1f}%")
+
+
+if __name__ == "__main__":
+    main()
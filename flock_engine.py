@@ -0,0 +1,189 @@
+# flock_engine.py
+
+import numpy as np
+import pygame
+
+from spatial_hash import SpatialHash
+from integrators import get_integrator
+
+
+class FlockEngine:
+    def __init__(self, screen, range=200, k_sep=1, k_coh=1, k_align=1, a_agr=0.1, a_tim=0.001, seed=None,
+                 integrator="semi_implicit", substeps=1):
+        """
+        All teams of boids in one set of contiguous arrays, stepped in one pass.
+
+        Every boid's position, velocity and team id live in shared (N, 2) / (N,)
+        arrays, so flocking within a team and reactions to other teams come out
+        of a single neighbour search and a few bincounts, however many teams
+        there are.
+
+        Parameters:
+        - screen (pygame.Surface): Surface the boids are drawn on.
+        - range (float): Neighbourhood radius for flocking and adversaries.
+        - k_sep, k_coh, k_align (float): Separation, cohesion and alignment gains.
+        - a_agr (float): Aggression, pull towards nearby adversaries.
+        - a_tim (float): Timidity, push away from nearby adversaries.
+        - seed (int): Seed for initial boid positions and velocities.
+        - integrator (str): Integration scheme, a name from integrators.INTEGRATORS.
+        - substeps (int): Integrator substeps per update.
+        """
+        self.rng = np.random.default_rng(seed)
+        self.screen = screen
+        self.range = range
+
+        self.k_sep = k_sep
+        self.k_coh = k_coh
+        self.k_align = k_align
+
+        self.a_agr = a_agr
+        self.a_tim = a_tim
+
+        self.X = np.zeros((0, 2))
+        self.X_dot = np.zeros((0, 2))
+        self.X_ddot = np.zeros((0, 2))
+        self.team = np.zeros(0, dtype=np.intp)
+
+        self.colors = []
+        self.slices = []
+        self.targets = np.zeros((0, 2))
+        self.has_target = np.zeros(0, dtype=bool)
+
+        # The screen wraps around, as for collisions, so boids see neighbours across the edges.
+        self.neighbor_search = SpatialHash(range, screen.get_size())
+        self.integrator = get_integrator(integrator)
+        self.substeps = substeps
+
+    @property
+    def N(self):
+        return len(self.X)
+
+    def add_team(self, x_star, N=5, col=(233, 10, 10)):
+        """
+        Add N boids scattered near x_star as a new team.
+
+        Returns:
+        - team (int): Id of the new team.
+        """
+        team = len(self.colors)
+        start = self.N
+        self.X = np.concatenate([self.X, self.rng.random((N, 2))*100 + x_star])
+        self.X_dot = np.concatenate([self.X_dot, self.rng.standard_normal((N, 2))*10])
+        self.X_ddot = np.concatenate([self.X_ddot, np.zeros((N, 2))])
+        self.team = np.concatenate([self.team, np.full(N, team, dtype=np.intp)])
+
+        self.colors.append(col)
+        self.slices.append(slice(start, start + N))
+        self.targets = np.concatenate([self.targets, np.zeros((1, 2))])
+        self.has_target = np.append(self.has_target, False)
+        return team
+
+    def positions(self, team):
+        """
+        View of one team's positions, shape (N_team, 2).
+        """
+        return self.X[self.slices[team]]
+
+    def velocities(self, team):
+        """
+        View of one team's velocities, shape (N_team, 2).
+        """
+        return self.X_dot[self.slices[team]]
+
+    def set_target(self, team, x_star):
+        """
+        Make a team follow x_star, or stop following anything if x_star is None.
+        """
+        if x_star is None:
+            self.has_target[team] = False
+        else:
+            self.targets[team] = x_star
+            self.has_target[team] = True
+
+    def get_state(self):
+        """
+        Return every boid and team as arrays and plain values, for checkpoints.
+        """
+        return {
+            "X": self.X.copy(),
+            "X_dot": self.X_dot.copy(),
+            "team": self.team.copy(),
+            "targets": self.targets.copy(),
+            "has_target": self.has_target.copy(),
+            "colors": [list(map(int, col)) for col in self.colors],
+            "slices": [[s.start, s.stop] for s in self.slices],
+        }
+
+    def set_state(self, state):
+        """
+        Replace every boid and team with a `get_state` result.
+        """
+        self.X = np.array(state["X"], dtype=float)
+        self.X_dot = np.array(state["X_dot"], dtype=float)
+        self.X_ddot = np.zeros_like(self.X)
+        self.team = np.array(state["team"], dtype=np.intp)
+        self.targets = np.array(state["targets"], dtype=float)
+        self.has_target = np.array(state["has_target"], dtype=bool)
+        self.colors = [tuple(col) for col in state["colors"]]
+        self.slices = [slice(start, stop) for start, stop in state["slices"]]
+
+    def update(self, dt, targets=None):
+        """
+        Advance every boid of every team by dt.
+
+        Parameters:
+        - dt (float): Time step.
+        - targets (dict): Optional {team: x_star} follow targets set before stepping.
+        """
+        for team, x_star in (targets or {}).items():
+            self.set_target(team, x_star)
+        self.integrator.step_inplace(self.X, self.X_dot, self._accelerate, dt, self.substeps)
+
+    def _accelerate(self, X, X_dot):
+        self.X_ddot = self.acceleration(X, X_dot)
+        return self.X_ddot
+
+    def acceleration(self, X, X_dot):
+        """
+        Compute every boid's acceleration from one neighbour search.
+        """
+        N = len(X)
+        i, j, R_ij = self.neighbor_search.build(X).pairs()
+        X_j = X[i] - R_ij  # Each neighbour's nearest image across the wrap
+        D2 = np.einsum("ij,ij->i", R_ij, R_ij)
+        same = self.team[i] == self.team[j]
+
+        def neighbour_sum(mask, values):
+            return np.stack([np.bincount(i[mask], weights=values[:, k], minlength=N) for k in range(2)], axis=1)
+
+        ## Flocking within each team, the same rules as BoidIntegrator
+        N_x = (np.bincount(i[same], minlength=N) + 1)[:, np.newaxis]  # Each boid counts itself
+        X_mean = (X + neighbour_sum(same, X_j[same])) / N_x
+        V_mean = (X_dot + neighbour_sum(same, X_dot[j[same]])) / N_x
+        D2_sum = np.bincount(i[same], weights=D2[same], minlength=N)[:, np.newaxis]
+
+        A_sep = np.where(N_x > 1, 10 * self.k_sep * (X - X_mean) / (D2_sum + 1e-5), 0)
+        A_coh = self.k_coh * V_mean - X_dot
+        A_align = self.k_align * X_mean - X
+
+        ## Adversaries in range: chase their centre, but shy away up close
+        other = ~same
+        M_y = np.bincount(i[other], minlength=N)[:, np.newaxis]
+        seen = M_y > 0
+        Y_mean = neighbour_sum(other, X_j[other]) / np.maximum(M_y, 1)
+        A_agr = self.a_agr * np.where(seen, Y_mean - X, 0)
+        A_tim = self.a_tim * neighbour_sum(other, R_ij[other] / (D2[other, np.newaxis] + 1e-5))
+
+        ## Following
+        A_fol = 0.5 * (self.targets[self.team] - X) * self.has_target[self.team, np.newaxis]
+
+        return A_fol + A_align + A_coh + A_sep + A_agr + A_tim
+
+    def draw(self):
+        """
+        Draw every boid, one batched blit per team.
+        """
+        for team, col in enumerate(self.colors):
+            sprite = pygame.Surface((10, 10))
+            sprite.fill(col)
+            self.screen.blits([(sprite, (x[0], x[1])) for x in self.positions(team)], doreturn=False)
@@ -1,11 +1,278 @@
 # game_logic.py
 
+import collections
+
 import numpy as np
-import random
-import pygame
+
+from rules import TIE_BREAKS, standard_rules, type_color
+
+ENGINES = ("loop", "numpy", "sparse", "parallel", "hashlife")
+
+# Side length, in cells, of the tiles the sparse engine tracks activity on and
+# the renderer redraws.
+TILE_SIZE = 32
+
+# Offsets of the 8 neighbours inside a grid padded by one cell on every side.
+NEIGHBOR_OFFSETS = [(0, 0), (0, 1), (0, 2),
+                    (1, 0),         (1, 2),
+                    (2, 0), (2, 1), (2, 2)]
+
+_MASK64 = (1 << 64) - 1
+
+
+def tie_break_index(seed, generation, y, x, num_choices):
+    """
+    Pick one of `num_choices` tied birth candidates for the cell at (x, y).
+
+    The choice is a hash of (seed, generation, y, x) rather than a draw from a
+    shared random stream, so every engine resolves a tie the same way no matter
+    in which order it visits the cells.
+
+    Parameters:
+        seed (int or ndarray): Seed of the board (one per cell when batched).
+        generation (int): The generation being computed.
+        y (int or ndarray): The y-coordinate(s) of the cell(s).
+        x (int or ndarray): The x-coordinate(s) of the cell(s).
+        num_choices (int or ndarray): Number of tied candidates.
+
+    Returns:
+        ndarray: Index of the chosen candidate, in 0..num_choices-1.
+    """
+    with np.errstate(over="ignore"):
+        h = np.asarray(seed, dtype=np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+        h ^= np.uint64(generation & _MASK64) * np.uint64(0xBF58476D1CE4E5B9)
+        h ^= np.asarray(y, dtype=np.uint64) * np.uint64(0x94D049BB133111EB)
+        h ^= np.asarray(x, dtype=np.uint64) * np.uint64(0xD6E8FEB86659FD93)
+    return (_mix64(h) % np.asarray(num_choices, dtype=np.uint64)).astype(np.intp)
+
+
+def _mix64(h):
+    """
+    splitmix64 finaliser of a uint64 array, in place where possible.
+    """
+    with np.errstate(over="ignore"):
+        h ^= h >> np.uint64(30)
+        h *= np.uint64(0xBF58476D1CE4E5B9)
+        h ^= h >> np.uint64(27)
+        h *= np.uint64(0x94D049BB133111EB)
+        h ^= h >> np.uint64(31)
+    return h
+
+
+def zobrist_hash(index, cell_types, num_types):
+    """
+    XOR of the Zobrist keys of the cells at flat `index` holding `cell_types`.
+
+    Keys are hashed from (index, type) on the fly instead of stored, so
+    boards of any size cost no key table. Empty cells have key 0, so a board's
+    hash is the XOR over its live cells and changing a cell from type a to b
+    flips the hash by key(a) ^ key(b).
+
+    Returns:
+        int: The 64-bit hash.
+    """
+    cell_types = np.asarray(cell_types)
+    live = cell_types != 0
+    h = np.asarray(index, dtype=np.uint64)[live] * np.uint64(num_types)
+    h += cell_types[live].astype(np.uint64)
+    return int(np.bitwise_xor.reduce(_mix64(h), initial=np.uint64(0)))
+
+
+def neighbor_counts(padded, num_types):
+    """
+    Count the neighbours of every type around each interior cell of a padded grid.
+
+    Parameters:
+        padded (ndarray): Grid of shape (..., H+2, W+2) whose border rows/columns
+                          already hold the wrapped-around neighbours.
+        num_types (int): Number of cell types, including the empty type 0.
+
+    Returns:
+        ndarray: uint8 array of shape (num_types, ..., H, W).
+    """
+    h, w = padded.shape[-2] - 2, padded.shape[-1] - 2
+    counts = np.zeros((num_types,) + padded.shape[:-2] + (h, w), dtype=np.uint8)
+    for t in range(1, num_types):
+        plane = padded == t
+        for dy, dx in NEIGHBOR_OFFSETS:
+            counts[t] += plane[..., dy:dy + h, dx:dx + w]
+    # Whatever is not a live neighbour is an empty one.
+    counts[0] = 8 - counts[1:].sum(axis=0, dtype=np.uint8)
+    return counts
+
+
+def _check_cells(grid, num_types):
+    """
+    Raise ValueError if `grid` holds anything but the cell types 0..num_types-1.
+
+    Every engine checks before looking cells up in the transition table, which
+    would otherwise fail or silently misread a stray value depending on the path.
+    """
+    if grid.size and (grid.max() >= num_types or (grid.dtype.kind == "i" and grid.min() < 0)):
+        raise ValueError(f"Cells must hold types 0..{num_types - 1}")
+
+
+def next_generation(padded, num_types, seed, generation, y0=0, x0=0, tie_break="random", rules=None):
+    """
+    Apply the competitive life rules to every interior cell of a padded grid.
+
+    Each cell's next type is looked up in the rule set's transition table by
+    its own type and its neighbour count signature; births tied between
+    several types are resolved according to the rule set's tie-break.
+
+    Parameters:
+        padded (ndarray): Grid of shape (..., H+2, W+2), see `neighbor_counts`.
+        num_types (int): Number of cell types, including the empty type 0.
+        seed (int or ndarray): Board seed, or one seed per leading batch index.
+        generation (int): The generation being computed.
+        y0 (int): Board y-coordinate of the first interior row.
+        x0 (int): Board x-coordinate of the first interior column.
+        tie_break (str): One of TIE_BREAKS, for the standard rules.
+        rules (RuleSet): Rules to apply; the standard rules for num_types and
+                         tie_break if None.
+
+    Returns:
+        ndarray: The next generation of the interior, shape (..., H, W).
+    """
+    if rules is None:
+        rules = standard_rules(num_types, tie_break)
+    current = padded[..., 1:-1, 1:-1]
+    _check_cells(current, rules.num_types)
+    counts = neighbor_counts(padded, num_types)
+    out = rules.table_as(current.dtype).take(rules.codes(current, counts[1:]))
+
+    ties = np.nonzero(out == rules.tie)
+    if len(ties[0]):
+        out[ties] = _resolve_ties(counts, ties, rules, seed, generation, y0, x0)
+    return out
+
+
+def changed_tiles(old, new):
+    """
+    Return a boolean mask of the TILE_SIZE tiles in which `old` and `new` differ.
+    """
+    return tiles_of(old != new)
+
+
+def tiles_of(mask):
+    """
+    Return a boolean mask of the TILE_SIZE tiles holding any True cell of `mask`.
+    """
+    rows = np.arange(0, mask.shape[0], TILE_SIZE)
+    cols = np.arange(0, mask.shape[1], TILE_SIZE)
+    return np.logical_or.reduceat(np.logical_or.reduceat(mask, rows, axis=0), cols, axis=1)
+
+
+def grow_tiles(tiles):
+    """
+    Return a tile mask grown by one tile in every direction, wrapping around the board.
+    """
+    grown = tiles.copy()
+    for dy in (-1, 0, 1):
+        for dx in (-1, 0, 1):
+            grown |= np.roll(tiles, (dy, dx), axis=(0, 1))
+    return grown
+
+
+def has_birth_ties(grid, rules):
+    """
+    Return whether stepping `grid` would need the rules' tie-break for any cell.
+
+    Whether a tie occurs depends on the grid alone, only its resolution on the
+    seed and generation.
+    """
+    if rules.tie_break == "lowest":  # Settled by the table itself
+        return False
+    counts = neighbor_counts(np.pad(grid, 1, mode="wrap"), rules.num_types)
+    return bool((rules.table_as(grid.dtype).take(rules.codes(grid, counts[1:])) == rules.tie).any())
+
+
+def _resolve_ties(counts, ties, rules, seed, generation, y0, x0):
+    """
+    Return the type born in each tied cell listed by the index tuple `ties`.
+    """
+    if np.ndim(seed):
+        seed = np.asarray(seed)[ties[0]]
+    candidates = rules.candidates(counts[(slice(1, None),) + ties])
+    pick = tie_break_index(seed, generation, ties[-2] + y0, ties[-1] + x0,
+                           candidates.sum(axis=0))
+    # Rank of each candidate among the tied ones, counted from the lowest type.
+    rank = np.cumsum(candidates, axis=0) - 1
+    return (candidates & (rank == pick)).argmax(axis=0) + 1
+
+
+class StepBuffers:
+    def __init__(self, height, width, num_types, dtype=int, rules=None):
+        """
+        Preallocated scratch space for stepping a board without heap allocation.
+
+        `step` computes the same generation as `next_generation` but writes every
+        intermediate into these arrays, so steady-state stepping allocates nothing
+        board-sized (only the handful of tied cells, if any).
+
+        Parameters:
+            height (int): The height of the grid.
+            width (int): The width of the grid.
+            num_types (int): Number of cell types, including the empty type 0.
+            dtype: Cell dtype of the grid.
+            rules (RuleSet): Rules to apply; the standard rules if None.
+        """
+        self.num_types = num_types
+        self.rules = rules
+        self.padded = np.zeros((height + 2, width + 2), dtype=dtype)
+        self.plane = np.zeros((height + 2, width + 2), dtype=bool)
+        self.counts = np.zeros((num_types, height, width), dtype=np.uint8)
+        # intp codes, so np.take gathers with them as they are instead of converting a copy.
+        self.code = np.zeros((height, width), dtype=np.intp)
+        self.scratch = None
+        if not (rules or standard_rules(num_types)).direct:  # Ranking needs two more intp planes
+            self.scratch = (np.zeros((height, width), dtype=np.intp), np.zeros((height, width), dtype=np.intp))
+        self.mask = np.zeros((height, width), dtype=bool)
+
+    def step(self, grid, out, seed, generation, tie_break="random"):
+        """
+        Write the generation after `grid` into `out`.
+
+        Parameters:
+            grid (ndarray): The current generation, shape (H, W).
+            out (ndarray): Destination array, same shape and dtype, distinct from grid.
+            seed (int): Board seed for birth tie-breaks.
+            generation (int): The generation being computed.
+            tie_break (str): One of TIE_BREAKS, if no rules were given.
+        """
+        rules = self.rules or standard_rules(self.num_types, tie_break)
+        _check_cells(grid, rules.num_types)
+        h, w = grid.shape
+        p = self.padded
+        p[1:-1, 1:-1] = grid
+        p[0, 1:-1] = grid[-1]
+        p[-1, 1:-1] = grid[0]
+        p[:, 0] = p[:, -2]
+        p[:, -1] = p[:, 1]
+        current = p[1:-1, 1:-1]
+
+        counts = self.counts
+        for t in range(1, self.num_types):
+            np.equal(p, t, out=self.plane)
+            counts[t].fill(0)
+            for dy, dx in NEIGHBOR_OFFSETS:
+                np.add(counts[t], self.plane[dy:dy + h, dx:dx + w], out=counts[t])
+
+        # Transition table lookup by own type and neighbour counts.
+        rules.codes(current, counts[1:], out=self.code, buffers=self.scratch)
+        # The cells were checked above, so every code is in range; unlike "raise",
+        # "clip" gathers straight into `out` without buffering it.
+        np.take(rules.table_as(out.dtype), self.code, out=out, mode="clip")
+
+        np.equal(out, rules.tie, out=self.mask)
+        if self.mask.any():
+            ties = np.nonzero(self.mask)
+            out[ties] = _resolve_ties(counts, ties, rules, seed, generation, 0, 0)
+
 
 class CompetitiveGameOfLife:
-    def __init__(self, width=50, height=50, cell_types=[0, 1, 2, 3, 4]):
+    def __init__(self, width=50, height=50, cell_types=[0, 1, 2, 3, 4], engine="loop", seed=None, processes=None, dtype=int,
+                 double_buffer=False, tie_break=None, track_bounds=False, rules=None, cycle_window=0):
         """
         Initialize the game logic with a grid of given width, height, and cell types.
         
@@ -13,11 +280,91 @@ class CompetitiveGameOfLife:
             width (int): The width of the grid.
             height (int): The height of the grid.
             cell_types (list): List of integers representing different cell types.
+            engine (str): Stepping engine, "loop" (per-cell Python), "numpy" (whole grid)
+                          or "sparse" (only tiles that changed last generation), or
+                          "parallel" (row strips over a process pool), or "hashlife"
+                          (memoized quadtree, fast for long jumps with `advance`).
+            seed (int): Seed for birth tie-breaks; a random one is drawn if None.
+            processes (int): Worker processes for the "parallel" engine, all cores if None.
+            dtype: Cell storage type. np.uint8 stores one byte per cell instead of eight.
+            double_buffer (bool): Let the "numpy" engine write each generation into a
+                                  preallocated back buffer and swap, instead of
+                                  allocating a new grid every step.
+            tie_break (str): Birth tie policy, one of TIE_BREAKS. Defaults to "random",
+                             or "lowest" for the hashlife engine, which requires it.
+            track_bounds (bool): Also keep per-type row and column counts, so
+                                 `bounds` can report each type's bounding box.
+            rules (RuleSet): Birth and survival rules for len(cell_types) types; the
+                             standard rules with `tie_break` if None. Its own
+                             tie_break then applies.
+            cycle_window (int): Generations of state hashes kept to detect still
+                                lifes and oscillators, see `cycle`; 0 disables it.
         """
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine {engine!r}, expected one of {ENGINES}")
+        if rules is not None:
+            if rules.num_types != len(cell_types):
+                raise ValueError(f"Rules for {rules.num_types} cell types, got {len(cell_types)}")
+            if tie_break is not None and tie_break != rules.tie_break:
+                raise ValueError(f"tie_break {tie_break!r} conflicts with the rules' {rules.tie_break!r}")
+            tie_break = rules.tie_break
+        if tie_break is None:
+            tie_break = "lowest" if engine == "hashlife" else "random"
+        if tie_break not in TIE_BREAKS:
+            raise ValueError(f"Unknown tie_break {tie_break!r}, expected one of {TIE_BREAKS}")
+        if engine == "hashlife" and tie_break != "lowest":
+            raise ValueError("The hashlife engine memoizes by neighbourhood only and needs tie_break='lowest'")
+        self.dtype = np.dtype(dtype)
+        # One spare value above the last type, for the table's tie marker.
+        if not np.issubdtype(self.dtype, np.integer) or np.iinfo(self.dtype).max < len(cell_types):
+            raise ValueError(f"dtype {self.dtype} cannot hold {len(cell_types)} cell types")
         self.width = width
         self.height = height
         self.cell_types = cell_types
-        self.grid = np.zeros((height, width), dtype=int)  # Start with an empty grid (all cells dead)
+        self.engine = engine
+        self.tie_break = tie_break
+        self.rules = rules if rules is not None else standard_rules(len(cell_types), tie_break)
+        if seed is None:
+            seed = int(np.random.SeedSequence().entropy) & _MASK64
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        self.generation = 0
+        self.grid = np.zeros((height, width), dtype=self.dtype)  # Start with an empty grid (all cells dead)
+        self.processes = processes
+        self.double_buffer = double_buffer
+        self._renderer = None
+        self._buffers = None
+        self._back = None
+        self._changed = None  # Reused mask of the cells the last step changed
+        self._stepper = None
+        self._hashlife = None
+        self._dirty = None  # Tiles changed since the renderer last looked, once it asks
+        self._active = None
+        self.recorder = None
+        # Live cells per type (index 0 counts empty cells), kept up to date from
+        # every change to the grid so reading them never scans the board.
+        self._populations = np.zeros(len(cell_types), dtype=np.int64)
+        self._populations[0] = width * height
+        self._row_counts = None
+        self._col_counts = None
+        if track_bounds:
+            self._row_counts = np.zeros((len(cell_types), height), dtype=np.int64)
+            self._col_counts = np.zeros((len(cell_types), width), dtype=np.int64)
+            self._row_counts[0] = width
+            self._col_counts[0] = height
+        if engine == "sparse":
+            self._active = np.zeros((-(-height // TILE_SIZE), -(-width // TILE_SIZE)), dtype=bool)
+        # Zobrist hash of the grid, updated from the changed cells, and the
+        # recent (generation, hash) history it is looked up in.
+        self.cycle_window = cycle_window
+        self._hash = 0 if cycle_window else None
+        self._history = collections.deque()
+        self._seen = {}
+        self._probe = None
+        self._tied_states = set()
+        self._cycle = None
+        self._cycle_frames = None
+        self._forget_history()
         self.colors = {
             0: (248, 247, 230),   # Empty cells (Black)
             1: (243, 45, 81),  # Type 1 (Red)
@@ -25,6 +372,8 @@ class CompetitiveGameOfLife:
             3: (45, 243, 81),  # Type 3 (Green)
             4: (243, 245, 10), # Type 4 (Yellow)
         }
+        for cell_type in range(5, len(cell_types)):
+            self.colors[cell_type] = type_color(cell_type)
 
     def get_neighbors(self, x, y):
         """
@@ -52,68 +401,480 @@ class CompetitiveGameOfLife:
             x (int): The x-coordinate of the cell.
             y (int): The y-coordinate of the cell.
         """
-        current_cell = self.grid[y, x]
+        self._set_cell(x, y, self._next_type(x, y))
+
+    def _next_type(self, x, y):
+        """
+        Look up the next type of the cell at (x, y) in the rules' transition table.
+        """
         neighbors = self.get_neighbors(x, y)
+        # Count the types of neighbors
+        neighbor_counts = [neighbors.count(i) for i in self.cell_types[1:]]
+        new_type = self.rules.lookup(self.grid[y, x], neighbor_counts)
+        if new_type == self.rules.tie:  # Resolve a birth tie with the seeded tie-break
+            new_type = self._resolve_tie(neighbor_counts, x, y)
+        return new_type
 
-        if current_cell == 0:  # If the cell is empty
-            # Count the types of neighbors
-            neighbor_counts = [neighbors.count(i) for i in self.cell_types[1:]]
-            max_count = max(neighbor_counts)
-            if max_count >= 3:  # Birth rule: 3 or more neighbors of the same type
-                # Overwrite with the majority type or resolve randomly if there's a tie
-                if neighbor_counts.count(max_count) > 1:
-                    new_type = random.choice([i+1 for i in range(len(neighbor_counts)) if neighbor_counts[i] == max_count])
-                else:
-                    new_type = neighbor_counts.index(max_count) + 1
-                self.grid[y, x] = new_type
-        else:  # If the cell is alive
-            # Count different neighbor types
-            same_type_count = neighbors.count(current_cell)
-            if same_type_count < 2 or same_type_count > 3:
-                # Death by underpopulation or overpopulation
-                self.grid[y, x] = 0
-            elif len(set(neighbors)) > 2:  # Check if the cell is surrounded by different types
-                self.grid[y, x] = 0
+    def _resolve_tie(self, neighbor_counts, x, y):
+        """
+        Choose the type born at (x, y) when several types share the majority.
+        """
+        tied = np.flatnonzero(self.rules.candidates(np.array(neighbor_counts))) + 1
+        return int(tied[int(tie_break_index(self.seed, self.generation, y, x, len(tied)))])
 
     def update_grid(self, paused):
         """
         Update the grid by applying the life rules to every cell.
         """
-        if not paused:
-            new_grid = self.grid.copy()
-            for y in range(self.height):
-                for x in range(self.width):
-                    current_cell = self.grid[y, x]
-                    neighbors = self.get_neighbors(x, y)
-
-                    if current_cell == 0:  # If the cell is empty
-                        # Count the types of neighbors
-                        neighbor_counts = [neighbors.count(i) for i in self.cell_types[1:]]
-                        max_count = max(neighbor_counts)
-                        if max_count >= 3:  # Birth rule: 3 or more neighbors of the same type
-                            # Overwrite with the majority type or resolve randomly if there's a tie
-                            if neighbor_counts.count(max_count) > 1:
-                                new_type = random.choice([i+1 for i in range(len(neighbor_counts)) if neighbor_counts[i] == max_count])
-                            else:
-                                new_type = neighbor_counts.index(max_count) + 1
-                            new_grid[y, x] = new_type
-                    else:  # If the cell is alive
-                        # Count different neighbor types
-                        same_type_count = neighbors.count(current_cell)
-                        if same_type_count < 2 or same_type_count > 3:
-                            # Death by underpopulation or overpopulation
-                            new_grid[y, x] = 0
-                        elif len(set(neighbors)) > 2:  # Check if the cell is surrounded by different types
-                            new_grid[y, x] = 0
-
-            self.grid = new_grid
+        if paused:
+            return
+        if self._cycle is not None:
+            self._jump_in_cycle(self.generation + 1)
+            return
+        previous = self.grid
+        if self.engine == "numpy":
+            self._update_grid_numpy()
+        elif self.engine == "sparse":
+            self._update_grid_sparse()
+        elif self.engine == "parallel":
+            self._update_grid_parallel()
+        elif self.engine == "hashlife":
+            self._update_grid_hashlife(1)
+        else:
+            self._update_grid_loop()
+        # The sparse engine updates in place and records its own changes.
+        if self.grid is not previous:
+            self._record_changes(previous)
+        self.generation += 1
+        if self.recorder is not None:
+            self.recorder.record(self.generation, self.grid)
+        self._observe_state()
+
+    def advance(self, generations):
+        """
+        Step the grid the given number of generations ahead.
+
+        The hashlife engine jumps there in powers of two, and once a cycle is
+        found any engine jumps straight to the target; a recorder then only
+        sees where it lands. Otherwise update_grid is called once per generation.
+
+        Parameters:
+            generations (int): Number of generations to advance.
+        """
+        if generations <= 0:
+            return
+        if self.engine != "hashlife":
+            for done in range(generations):
+                if self._cycle is not None:
+                    self._jump_in_cycle(self.generation + generations - done)
+                    return
+                self.update_grid(False)
+            return
+        if self._cycle is not None:
+            self._jump_in_cycle(self.generation + generations)
+            return
+        previous = self.grid
+        self._update_grid_hashlife(generations)
+        self._record_changes(previous)
+        self.generation += generations
+        if self.recorder is not None:
+            self.recorder.record(self.generation, self.grid)
+        if generations == 1:
+            self._observe_state()
+        else:  # The history only holds consecutive generations
+            self._forget_history()
+
+    @property
+    def cycle(self):
+        """
+        The (start, period) of the cycle the board has settled into, or None.
+
+        With a cycle_window, a state whose hash was seen up to cycle_window
+        generations earlier is followed for one period. If it comes back exactly
+        and no birth needed the seeded tie-break (which depends on the generation)
+        on the way, it repeats forever: period 1 is a still life, longer periods
+        oscillators. From then on stepping replays the stored period instead of
+        computing it. Any edit forgets the cycle and the history.
+        """
+        return self._cycle
+
+    @property
+    def state_hash(self):
+        """
+        64-bit Zobrist hash of the grid, or None without a cycle_window.
+        """
+        return self._hash
+
+    def _observe_state(self):
+        """
+        Add the new state to the history, and start or finish checking a possible cycle.
+        """
+        if self._hash is None or self._cycle is not None:
+            return
+        probe = self._probe
+        if probe is not None:
+            if self.generation < probe["start"] + probe["period"]:
+                if self._tied():
+                    self._probe = None
+                else:
+                    probe["frames"].append(self.grid.copy())
+            else:
+                self._probe = None
+                if np.array_equal(self.grid, probe["frames"][0]):
+                    self._cycle = (probe["start"], probe["period"])
+                    self._cycle_frames = probe["frames"]
+                    self._history.clear()
+                    self._seen.clear()
+                    return
+
+        seen = self._seen.get(self._hash)
+        if seen is not None and self._probe is None and not self._tied():
+            self._probe = {"start": self.generation, "period": self.generation - seen,
+                           "frames": [self.grid.copy()]}
+        self._remember()
+
+    def _tied(self):
+        """
+        Whether stepping the current state needs the seeded tie-break, remembered per state hash.
+        """
+        if self._hash in self._tied_states:
+            return True
+        if not has_birth_ties(self.grid, self.rules):
+            return False
+        if len(self._tied_states) >= self.cycle_window:
+            self._tied_states.clear()
+        self._tied_states.add(self._hash)
+        return True
+
+    def _remember(self):
+        """
+        Push the current (generation, hash) into the bounded history.
+        """
+        self._history.append((self.generation, self._hash))
+        self._seen[self._hash] = self.generation
+        while len(self._history) > self.cycle_window:
+            generation, h = self._history.popleft()
+            if self._seen.get(h) == generation:
+                del self._seen[h]
+
+    def _forget_history(self):
+        """
+        Drop the history and any cycle, e.g. after an edit, and start over from the current state.
+        """
+        self._history.clear()
+        self._seen.clear()
+        self._probe = None
+        self._tied_states.clear()
+        self._cycle = None
+        self._cycle_frames = None
+        if self._hash is not None:
+            self._remember()
+
+    def _jump_in_cycle(self, generation):
+        """
+        Move to `generation` by replaying the stored period of a confirmed cycle.
+        """
+        start, period = self._cycle
+        previous = self.grid
+        self.grid = self._cycle_frames[(generation - start) % period].copy()
+        self._record_changes(previous)
+        self.generation = generation
+        if self._active is not None:  # Tile activity is stale after a jump
+            self._active[:] = True
+        if self.recorder is not None:
+            self.recorder.record(self.generation, self.grid)
+
+    def _record_changes(self, previous):
+        """
+        Fold the difference between `previous` and the new grid into the dirty tiles and statistics.
+        """
+        if self._changed is None:
+            self._changed = np.zeros((self.height, self.width), dtype=bool)
+        changed = np.not_equal(previous, self.grid, out=self._changed)
+        if self._dirty is not None:
+            self._dirty |= tiles_of(changed)
+        # Flat indices and take are much cheaper than boolean-mask indexing here.
+        index = np.flatnonzero(changed)
+        old, new = previous.ravel().take(index), self.grid.ravel().take(index)
+        self._count_changes(old, new, index)
+
+    @property
+    def _needs_positions(self):
+        """
+        Whether `_count_changes` needs the positions of changed cells, not just their types.
+        """
+        return self._row_counts is not None or self._hash is not None
+
+    def _count_changes(self, old, new, index=None):
+        """
+        Update the statistics and hash for cells at flat `index` changing from types `old` to `new`.
+
+        `index` may be left out unless `_needs_positions`.
+        """
+        num_types = len(self.cell_types)
+        self._populations += np.bincount(new, minlength=num_types) - np.bincount(old, minlength=num_types)
+        if self._hash is not None:
+            self._hash ^= zobrist_hash(index, old, num_types) ^ zobrist_hash(index, new, num_types)
+        if self._row_counts is None:
+            return
+        ys, xs = np.divmod(index, self.width)
+        for counts, coords in ((self._row_counts, ys), (self._col_counts, xs)):
+            size = counts.shape[1]
+            counts += (np.bincount(new.astype(np.intp) * size + coords, minlength=num_types * size)
+                       - np.bincount(old.astype(np.intp) * size + coords, minlength=num_types * size)
+                       ).reshape(num_types, size)
+
+    def recount(self):
+        """
+        Recompute the statistics from the whole grid, e.g. after assigning self.grid directly.
+        """
+        num_types = len(self.cell_types)
+        self._populations[:] = np.bincount(self.grid.ravel(), minlength=num_types)
+        if self._hash is not None:
+            index = np.flatnonzero(self.grid)
+            self._hash = zobrist_hash(index, self.grid.ravel().take(index), num_types)
+        if self._row_counts is not None:
+            one_hot = self.grid[np.newaxis] == np.arange(num_types).reshape(-1, 1, 1)
+            self._row_counts[:] = one_hot.sum(axis=2)
+            self._col_counts[:] = one_hot.sum(axis=1)
+
+    @property
+    def populations(self):
+        """
+        Read-only array of cell counts per type, empty cells at index 0.
+        """
+        view = self._populations.view()
+        view.flags.writeable = False
+        return view
+
+    def population(self, cell_type):
+        """
+        Return the number of cells of the given type.
+        """
+        return int(self._populations[cell_type])
+
+    def bounds(self, cell_type):
+        """
+        Return the bounding box of every cell of the given type.
+
+        Needs track_bounds=True. Boxes do not wrap around the board edges.
+
+        Returns:
+            tuple: (x0, y0, x1, y1) with exclusive ends, or None if there are no such cells.
+        """
+        if self._row_counts is None:
+            raise ValueError("Bounding boxes need track_bounds=True")
+        rows = np.flatnonzero(self._row_counts[cell_type])
+        if len(rows) == 0:
+            return None
+        cols = np.flatnonzero(self._col_counts[cell_type])
+        return int(cols[0]), int(rows[0]), int(cols[-1]) + 1, int(rows[-1]) + 1
+
+    def record_to(self, recorder):
+        """
+        Stream every generation from now on to `recorder`, starting with the
+        current grid; None stops recording.
+
+        Parameters:
+            recorder (GenerationRecorder): Where to send each new generation.
+        """
+        self.recorder = recorder
+        if recorder is not None:
+            recorder.record(self.generation, self.grid)
+
+    def _update_grid_hashlife(self, generations):
+        """
+        Jump the grid ahead with the memoized quadtree engine.
+        """
+        if self._hashlife is None:
+            from hashlife import HashLifeEngine
+            self._hashlife = HashLifeEngine(len(self.cell_types), rules=self.rules)
+        self.grid = self._hashlife.advance(self.grid, generations).astype(self.dtype, copy=False)
+
+    def _update_grid_numpy(self):
+        """
+        Step the whole grid at once with the vectorized rules.
+        """
+        if self.double_buffer:
+            if self._buffers is None:
+                self._buffers = StepBuffers(self.height, self.width, len(self.cell_types), self.dtype,
+                                            self.rules)
+                self._back = np.zeros_like(self.grid)
+            self._buffers.step(self.grid, self._back, self.seed, self.generation, self.tie_break)
+            self.grid, self._back = self._back, self.grid
+            return
+        padded = np.pad(self.grid, 1, mode="wrap")
+        self.grid = next_generation(padded, len(self.cell_types), self.seed, self.generation,
+                                    rules=self.rules)
+
+    def _update_grid_parallel(self):
+        """
+        Step the grid over a pool of worker processes sharing it through shared memory.
+        """
+        if self._stepper is None:
+            from parallel_engine import ParallelStepper
+            self._stepper = ParallelStepper(self.height, self.width, self.grid.dtype, self.processes,
+                                            self.rules)
+        if self.grid is not self._stepper.grid:  # Edited or replaced since the last step
+            self._stepper.grid[:] = self.grid
+        self._stepper.step(len(self.cell_types), self.seed, self.generation, self.tie_break)
+        self.grid = self._stepper.grid
+
+    def close(self):
+        """
+        Release the worker processes and shared memory held by the "parallel" engine.
+        """
+        if self._stepper is not None:
+            self.grid = self.grid.copy()
+            self._stepper.close()
+            self._stepper = None
+
+    def _update_grid_sparse(self):
+        """
+        Step only the tiles that changed last generation, plus their neighbours.
+
+        Cells outside those tiles saw no change in their neighbourhood, so they
+        cannot change now either. The grid is updated in place.
+        """
+        changed = np.zeros_like(self._active)
+        results = []
+        for ty, tx in zip(*np.nonzero(self._active)):
+            y0, x0 = ty * TILE_SIZE, tx * TILE_SIZE
+            y1, x1 = min(y0 + TILE_SIZE, self.height), min(x0 + TILE_SIZE, self.width)
+            padded = self._tile_with_halo(y0, y1, x0, x1)
+            if not padded.any():  # Nothing alive, nothing can be born
+                continue
+            new = next_generation(padded, len(self.cell_types), self.seed, self.generation, y0, x0,
+                                  rules=self.rules)
+            if not np.array_equal(new, padded[1:-1, 1:-1]):
+                results.append((y0, y1, x0, x1, new))
+                changed[ty, tx] = True
+
+        # Write back only once every tile has read the previous generation.
+        for y0, y1, x0, x1, new in results:
+            old = self.grid[y0:y1, x0:x1]
+            if self._needs_positions:
+                ys, xs = np.nonzero(old != new)
+                self._count_changes(old[ys, xs], new[ys, xs], (ys + y0) * self.width + xs + x0)
+            else:
+                diff = old != new
+                self._count_changes(old[diff], new[diff])
+            self.grid[y0:y1, x0:x1] = new
+
+        self._active = grow_tiles(changed)
+        if self._dirty is not None:
+            self._dirty |= changed
+
+    def _tile_with_halo(self, y0, y1, x0, x1):
+        """
+        Return the cells of rows y0..y1 and columns x0..x1 with a 1-cell wrapped halo.
+        """
+        if y0 > 0 and x0 > 0 and y1 < self.height and x1 < self.width:
+            return self.grid[y0 - 1:y1 + 1, x0 - 1:x1 + 1]
+        ys = np.arange(y0 - 1, y1 + 1) % self.height
+        xs = np.arange(x0 - 1, x1 + 1) % self.width
+        return self.grid[np.ix_(ys, xs)]
+
+    def _set_cell(self, x, y, cell_type):
+        """
+        Write one cell, keeping the statistics and change tracking up to date.
+        """
+        self._check_types(cell_type, cell_type)
+        old = int(self.grid[y, x])
+        if old != cell_type:
+            self._populations[old] -= 1
+            self._populations[cell_type] += 1
+            if self._hash is not None:
+                index = y * self.width + x
+                self._hash ^= zobrist_hash([index, index], [old, cell_type], len(self.cell_types))
+            if self._row_counts is not None:
+                self._row_counts[old, y] -= 1
+                self._row_counts[cell_type, y] += 1
+                self._col_counts[old, x] -= 1
+                self._col_counts[cell_type, x] += 1
+        self.grid[y, x] = cell_type
+        self._touch_cell(x, y)
+
+    def _check_types(self, lowest, highest):
+        """
+        Raise ValueError, before anything is written, if cell types from `lowest` to `highest` are not all valid.
+        """
+        if lowest < 0 or highest >= len(self.cell_types):
+            raise ValueError(f"Cell types must be in 0..{len(self.cell_types) - 1}")
+
+    def _touch_cell(self, x, y):
+        """
+        Record an edit at (x, y): redraw its tile, and make the sparse engine
+        re-evaluate that tile and its neighbours.
+        """
+        ty, tx = y // TILE_SIZE, x // TILE_SIZE
+        self._forget_history()
+        if self._dirty is not None:
+            self._dirty[ty, tx] = True
+        if self._active is None:
+            return
+        n_ty, n_tx = self._active.shape
+        for dy in (-1, 0, 1):
+            for dx in (-1, 0, 1):
+                self._active[(ty + dy) % n_ty, (tx + dx) % n_tx] = True
+
+    def mark_all_active(self):
+        """
+        Make the sparse engine re-evaluate, and the renderer redraw, every tile,
+        and recount the statistics, e.g. after assigning self.grid directly.
+        """
+        self.recount()
+        self._forget_history()
+        if self._active is not None:
+            self._active[:] = True
+        if self._dirty is not None:
+            self._dirty[:] = True
+
+    @property
+    def has_dirty_tiles(self):
+        """
+        Whether any tile changed since the last pop_dirty_tiles; True until change tracking starts.
+        """
+        return self._dirty is None or bool(self._dirty.any())
+
+    def pop_dirty_tiles(self):
+        """
+        Return the mask of TILE_SIZE tiles changed since the last call, and clear it.
+
+        Change tracking starts with the first call, which reports every tile.
+        """
+        if self._dirty is None:
+            shape = (-(-self.height // TILE_SIZE), -(-self.width // TILE_SIZE))
+            self._dirty = np.zeros(shape, dtype=bool)
+            return np.ones(shape, dtype=bool)
+        dirty = self._dirty.copy()
+        self._dirty[:] = False
+        return dirty
+
+    def _update_grid_loop(self):
+        """
+        Step the grid one cell at a time.
+        """
+        _check_cells(self.grid, self.rules.num_types)
+        new_grid = self.grid.copy()
+        for y in range(self.height):
+            for x in range(self.width):
+                new_grid[y, x] = self._next_type(x, y)
+
+        self.grid = new_grid
         
 
     def reset_grid(self):
         """
         Reset the grid to an empty state (no living cells).
         """
-        self.grid = np.zeros((self.height, self.width), dtype=int)
+        self.grid = np.zeros((self.height, self.width), dtype=self.dtype)
+        self.recount()
+        self._forget_history()
+        if self._active is not None:
+            self._active[:] = False
+        if self._dirty is not None:
+            self._dirty[:] = True
 
     def place_cell(self, x, y, cell_type):
         """
@@ -125,7 +886,7 @@ class CompetitiveGameOfLife:
             cell_type (int): The type of cell to place.
         """
         if 0 <= x < self.width and 0 <= y < self.height:
-            self.grid[y, x] = cell_type
+            self._set_cell(x, y, cell_type)
 
     def remove_cell(self, x, y):
         """
@@ -137,7 +898,137 @@ class CompetitiveGameOfLife:
             cell_type (int): The type of cell to place.
         """
         if 0 <= x < self.width and 0 <= y < self.height:
-            self.grid[y, x] = 0
+            self._set_cell(x, y, 0)
+
+    def place_cells(self, xs, ys, cell_type):
+        """
+        Place cells at many coordinates in one write.
+
+        Coordinates off the board are ignored, as with place_cell; where a
+        coordinate repeats, the last one wins.
+
+        Parameters:
+            xs (array_like): x-coordinates of the cells.
+            ys (array_like): y-coordinates of the cells.
+            cell_type (int or array_like): The type to place, or one type per cell.
+        """
+        xs = np.asarray(xs, dtype=np.intp).ravel()
+        ys = np.asarray(ys, dtype=np.intp).ravel()
+        types = np.broadcast_to(np.asarray(cell_type), xs.shape)
+        on_board = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+        index = (ys * self.width + xs)[on_board]
+        types = types[on_board]
+        # Keep the last write to each cell: unique finds the first in reversed order.
+        index, last = np.unique(index[::-1], return_index=True)
+        self._write_cells(index, types[::-1][last])
+
+    def clear_cells(self, xs, ys):
+        """
+        Empty the cells at many coordinates in one write, see place_cells.
+        """
+        self.place_cells(xs, ys, 0)
+
+    def stamp(self, pattern, x, y, transparent=False):
+        """
+        Copy a pattern onto the board with its top-left corner at (x, y), wrapping around the edges.
+
+        Parameters:
+            pattern (array_like): Cell types of shape (rows, columns), at most the board's size.
+            x (int): Board x-coordinate of the pattern's first column.
+            y (int): Board y-coordinate of the pattern's first row.
+            transparent (bool): Leave the board as it is under the pattern's empty cells.
+        """
+        pattern = np.asarray(pattern)
+        if pattern.ndim != 2:
+            raise ValueError(f"A pattern must be 2-D, got shape {pattern.shape}")
+        self._write_region(x, y, pattern, pattern != 0 if transparent else None)
+
+    def fill_rect(self, x, y, width, height, cell_type):
+        """
+        Fill a width x height rectangle with top-left corner (x, y), wrapping around the edges.
+        """
+        self._write_region(x, y, np.full((height, width), cell_type, dtype=self.dtype))
+
+    def fill_circle(self, cx, cy, radius, cell_type):
+        """
+        Fill every cell whose centre lies within `radius` cells of (cx, cy), wrapping around the edges.
+        """
+        r = int(radius)
+        offsets = np.arange(-r, r + 1)
+        inside = offsets[:, np.newaxis] ** 2 + offsets ** 2 <= radius ** 2
+        self._write_region(cx - r, cy - r, np.full(inside.shape, cell_type, dtype=self.dtype), inside)
+
+    def load_rle(self, path, x=None, y=None, cell_type=None, transparent=False):
+        """
+        Stamp a pattern from an RLE file, see patterns.parse_rle.
+
+        Parameters:
+            path (str): The .rle file.
+            x (int): Board x-coordinate of the pattern's left edge; centred if None.
+            y (int): Board y-coordinate of the pattern's top edge; centred if None.
+            cell_type (int): Place every live cell as this type instead of its state.
+            transparent (bool): Leave the board as it is under the pattern's empty cells.
+
+        Returns:
+            ndarray: The pattern as placed.
+        """
+        from patterns import read_rle
+        pattern = read_rle(path)
+        if cell_type is not None:
+            pattern[pattern != 0] = cell_type
+        h, w = pattern.shape
+        x = (self.width - w) // 2 if x is None else x
+        y = (self.height - h) // 2 if y is None else y
+        self.stamp(pattern, x, y, transparent)
+        return pattern
+
+    def _write_region(self, x, y, block, mask=None):
+        """
+        Write `block` onto the board at (x, y), wrapping, only where `mask` is True if given.
+        """
+        h, w = block.shape
+        if h > self.height or w > self.width:
+            raise ValueError(f"A {h}x{w} region does not fit on a {self.height}x{self.width} board")
+        x %= self.width
+        y %= self.height
+        rows = (y + np.arange(h)) % self.height
+        cols = (x + np.arange(w)) % self.width
+        if y + h <= self.height and x + w <= self.width:
+            region = (slice(y, y + h), slice(x, x + w))  # No wrap: a plain view
+        else:
+            region = np.ix_(rows, cols)
+        changed = self.grid[region] != block
+        if mask is not None:
+            changed &= mask
+        index = (rows[:, np.newaxis] * self.width + cols)[changed]
+        self._write_cells(index, block[changed])
+
+    def _write_cells(self, index, types):
+        """
+        Write distinct cells at flat `index` in one go, keeping the statistics and change tracking up to date.
+        """
+        types = np.asarray(types)
+        if types.size:
+            self._check_types(types.min(), types.max())
+        self.grid = np.ascontiguousarray(self.grid)  # So the flat view below writes through
+        cells = self.grid.reshape(-1)
+        old = cells.take(index)
+        changed = old != types
+        index, old, new = index[changed], old[changed], types[changed].astype(self.dtype)
+        if not len(index):
+            return
+        cells[index] = new
+        self._count_changes(old, new, index)
+        self._forget_history()
+        if self._dirty is None and self._active is None:
+            return
+        tiles = np.zeros((-(-self.height // TILE_SIZE), -(-self.width // TILE_SIZE)), dtype=bool)
+        ys, xs = np.divmod(index, self.width)
+        tiles[ys // TILE_SIZE, xs // TILE_SIZE] = True
+        if self._dirty is not None:
+            self._dirty |= tiles
+        if self._active is not None:
+            self._active |= grow_tiles(tiles)
 
     def draw_grid(self, screen, cell_size=10, paused=False):
         """
@@ -146,13 +1037,29 @@ class CompetitiveGameOfLife:
         Parameters:
             screen (pygame.Surface): The Pygame screen to draw on.
             cell_size (int): The size of each cell in pixels.
+            paused (bool): Draw empty cells in the paused colour.
         """
-        for y in range(self.height):
-            for x in range(self.width):
-                if paused:
-                    self.colors[0] = (148, 147, 150)
-                else:
-                    self.colors[0] = (248, 247, 230)
+        self._get_renderer().draw(screen, self.grid, cell_size, paused)
+
+    def draw_dirty(self, screen, cell_size=10, paused=False):
+        """
+        Redraw only the tiles changed since the last call.
 
-                color = self.colors[self.grid[y, x]]
-                pygame.draw.rect(screen, color, (x * cell_size, y * cell_size, cell_size, cell_size))
\ No newline at end of file
+        Parameters:
+            screen (pygame.Surface): The Pygame screen to draw on.
+            cell_size (int): The size of each cell in pixels.
+            paused (bool): Draw empty cells in the paused colour.
+
+        Returns:
+            list: The pygame.Rect areas that were redrawn, for pygame.display.update.
+        """
+        return self._get_renderer().draw_tiles(screen, self.grid, self.pop_dirty_tiles(), cell_size, paused)
+
+    def _get_renderer(self):
+        """
+        Return the board's GridRenderer, created on first use.
+        """
+        if self._renderer is None:
+            from renderer import GridRenderer  # Only needed for drawing, so headless runs never load pygame
+            self._renderer = GridRenderer(self.colors)
+        return self._renderer
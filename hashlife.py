@@ -0,0 +1,233 @@
+# hashlife.py
+
+from collections import OrderedDict
+
+import numpy as np
+
+from game_logic import next_generation
+from rules import standard_rules
+
+
+class Node:
+    """
+    A square quadtree node of side 2**level. Nodes are hash-consed by
+    HashLifeEngine, so two nodes with the same contents are the same object and
+    identity comparison is structural comparison.
+    """
+    __slots__ = ("level", "nw", "ne", "sw", "se", "population")
+
+    def __init__(self, level, nw, ne, sw, se, population):
+        self.level = level
+        self.nw = nw
+        self.ne = ne
+        self.sw = sw
+        self.se = se
+        self.population = population
+
+
+class HashLifeEngine:
+    def __init__(self, num_types, max_nodes=1_000_000, max_results=1_000_000, rules=None):
+        """
+        Memoized quadtree stepping for the competitive rules on a toroidal board.
+
+        The torus is unrolled into its periodic tiling of the plane, which is
+        exactly equivalent because the rules are local and, with the "lowest"
+        tie-break, do not depend on position or time. A node of level L then
+        yields its centre 2**(L-2) generations later, and jumps are composed from
+        powers of two. This pays off on boards that have settled into still lifes
+        and oscillators; on a chaotic soup the numpy engine is much faster.
+
+        Parameters:
+            num_types (int): Number of cell types, including the empty type 0.
+            max_nodes (int): Size of the hash-consing table before it is flushed.
+            max_results (int): Capacity of the LRU cache of stepped nodes.
+            rules (RuleSet): Rules to step with, which must use the "lowest"
+                             tie-break; the standard rules if None.
+        """
+        if rules is None:
+            rules = standard_rules(num_types, "lowest")
+        if rules.tie_break != "lowest":
+            raise ValueError("The hashlife engine memoizes by neighbourhood only and needs tie_break='lowest'")
+        self.num_types = num_types
+        self.rules = rules
+        self.max_nodes = max_nodes
+        self.max_results = max_results
+        self._nodes = {}
+        self._results = OrderedDict()
+        self._empty = [0]
+
+    def clear(self):
+        """
+        Drop every cached node and result.
+        """
+        self._nodes.clear()
+        self._results.clear()
+        self._empty = [0]
+
+    def join(self, nw, ne, sw, se):
+        """
+        Return the canonical node with the given quadrants (cell types at level 1).
+        """
+        key = (nw, ne, sw, se)
+        node = self._nodes.get(key)
+        if node is None:
+            if isinstance(nw, Node):
+                level = nw.level + 1
+                population = nw.population + ne.population + sw.population + se.population
+            else:
+                level = 1
+                population = (nw != 0) + (ne != 0) + (sw != 0) + (se != 0)
+            node = Node(level, nw, ne, sw, se, population)
+            if len(self._nodes) >= self.max_nodes:
+                # Flushing mid-step is safe: existing nodes stay valid, later
+                # duplicates of them only cost cache misses.
+                self.clear()
+            self._nodes[key] = node
+        return node
+
+    def empty(self, level):
+        """
+        Return the canonical all-empty node of the given level (0 is a bare cell).
+        """
+        while len(self._empty) <= level:
+            e = self._empty[-1]
+            self._empty.append(self.join(e, e, e, e))
+        return self._empty[level]
+
+    def centre(self, node):
+        """
+        Return the centre quarter of a node, one level down.
+        """
+        return self.join(node.nw.se, node.ne.sw, node.sw.ne, node.se.nw)
+
+    def _base(self, node):
+        """
+        Step a level-2 (4x4) node by one generation, returning its 2x2 centre.
+        """
+        cells = np.array([[node.nw.nw, node.nw.ne, node.ne.nw, node.ne.ne],
+                          [node.nw.sw, node.nw.se, node.ne.sw, node.ne.se],
+                          [node.sw.nw, node.sw.ne, node.se.nw, node.se.ne],
+                          [node.sw.sw, node.sw.se, node.se.sw, node.se.se]], dtype=np.uint8)
+        out = next_generation(cells, self.num_types, 0, 0, rules=self.rules)
+        return self.join(int(out[0, 0]), int(out[0, 1]), int(out[1, 0]), int(out[1, 1]))
+
+    def step(self, node, j):
+        """
+        Return the centre of `node` (one level down) 2**j generations later.
+
+        Parameters:
+            node (Node): Node of level L >= 2.
+            j (int): log2 of the number of generations, 0 <= j <= L-2.
+        """
+        if node.population == 0:
+            return self.empty(node.level - 1)
+        key = (node, j)
+        result = self._results.get(key)
+        if result is not None:
+            self._results.move_to_end(key)
+            return result
+
+        if node.level == 2:
+            result = self._base(node)
+        else:
+            a, b, c, d = node.nw, node.ne, node.sw, node.se
+            # The nine overlapping sub-squares of side 2**(L-1).
+            n00, n02, n20, n22 = a, b, c, d
+            n01 = self.join(a.ne, b.nw, a.se, b.sw)
+            n10 = self.join(a.sw, a.se, c.nw, c.ne)
+            n11 = self.join(a.se, b.sw, c.ne, d.nw)
+            n12 = self.join(b.sw, b.se, d.nw, d.ne)
+            n21 = self.join(c.ne, d.nw, c.se, d.sw)
+            squares = (n00, n01, n02, n10, n11, n12, n20, n21, n22)
+
+            if j == node.level - 2:
+                # Full speed: spend half the generations here, half below.
+                r = [self.step(n, j - 1) for n in squares]
+                inner = j - 1
+            else:
+                r = [self.centre(n) for n in squares]
+                inner = j
+            result = self.join(
+                self.step(self.join(r[0], r[1], r[3], r[4]), inner),
+                self.step(self.join(r[1], r[2], r[4], r[5]), inner),
+                self.step(self.join(r[3], r[4], r[6], r[7]), inner),
+                self.step(self.join(r[4], r[5], r[7], r[8]), inner),
+            )
+
+        self._results[key] = result
+        if len(self._results) > self.max_results:
+            self._results.popitem(last=False)
+        return result
+
+    def from_torus(self, grid, level, oy, ox):
+        """
+        Build the node of side 2**level whose top-left cell sits at (ox, oy) in
+        the periodic tiling of `grid`.
+        """
+        height, width = grid.shape
+        memo = {}
+        cells = grid.tolist()
+
+        def build(level, y, x):
+            key = (level, y % height, x % width)
+            node = memo.get(key)
+            if node is None:
+                if level == 1:
+                    y0, y1 = y % height, (y + 1) % height
+                    x0, x1 = x % width, (x + 1) % width
+                    node = self.join(cells[y0][x0], cells[y0][x1], cells[y1][x0], cells[y1][x1])
+                else:
+                    half = 1 << (level - 1)
+                    node = self.join(build(level - 1, y, x), build(level - 1, y, x + half),
+                                     build(level - 1, y + half, x), build(level - 1, y + half, x + half))
+                memo[key] = node
+            return node
+
+        return build(level, oy, ox)
+
+    def to_array(self, node, height, width):
+        """
+        Return the top-left height x width cells of a node as an array.
+        """
+        out = np.zeros((height, width), dtype=np.uint8)
+
+        def fill(node, level, y, x):
+            if y >= height or x >= width:
+                return
+            if level == 0:
+                out[y, x] = node
+                return
+            if node.population == 0:
+                return
+            half = 1 << (level - 1)
+            fill(node.nw, level - 1, y, x)
+            fill(node.ne, level - 1, y, x + half)
+            fill(node.sw, level - 1, y + half, x)
+            fill(node.se, level - 1, y + half, x + half)
+
+        fill(node, node.level, 0, 0)
+        return out
+
+    def jump(self, grid, j):
+        """
+        Return the toroidal board `grid` 2**j generations later.
+        """
+        height, width = grid.shape
+        # The result covers the centre half of the root, which must hold the board.
+        level = max(j + 2, int(np.ceil(np.log2(max(height, width, 2)))) + 1)
+        quarter = 1 << (level - 2)
+        root = self.from_torus(grid, level, -quarter, -quarter)
+        result = self.step(root, j)
+        return self.to_array(result, height, width)
+
+    def advance(self, grid, generations):
+        """
+        Return the toroidal board `grid` the given number of generations later.
+        """
+        j = 0
+        while generations:
+            if generations & 1:
+                grid = self.jump(grid, j)
+            generations >>= 1
+            j += 1
+        return grid
@@ -0,0 +1,225 @@
+# headless.py
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+import checkpoint
+from recorder import GenerationRecorder
+from game_logic import CompetitiveGameOfLife, ENGINES, TIE_BREAKS
+from rules import RuleSet
+
+PATTERNS = ("random", "soup", "empty")
+
+
+def seed_board(game, pattern="random", density=0.3):
+    """
+    Fill the board with an initial pattern drawn from the game's seeded RNG.
+
+    Parameters:
+        game (CompetitiveGameOfLife): The board to fill.
+        pattern (str): "random" fills the whole board, "soup" a centred square a
+                       quarter of the board wide, "empty" leaves it blank. A path
+                       ending in .rle is stamped in the centre of the board, any
+                       other value is read as the path of a .npy grid.
+        density (float): Fraction of live cells for "random" and "soup".
+    """
+    game.reset_grid()
+    num_types = len(game.cell_types)
+    if pattern == "empty":
+        return
+    if pattern in ("random", "soup"):
+        if pattern == "random":
+            y0, x0, h, w = 0, 0, game.height, game.width
+        else:
+            h, w = max(game.height // 4, 1), max(game.width // 4, 1)
+            y0, x0 = (game.height - h) // 2, (game.width - w) // 2
+        cells = game.rng.integers(1, num_types, size=(h, w))
+        cells[game.rng.random((h, w)) >= density] = 0
+        game.grid[y0:y0 + h, x0:x0 + w] = cells
+    elif pattern.endswith(".rle"):
+        game.load_rle(pattern)
+        return
+    else:
+        cells = np.load(pattern)
+        if cells.shape != game.grid.shape:
+            raise ValueError(f"Pattern {pattern} has shape {cells.shape}, board is {game.grid.shape}")
+        game.grid[:] = cells
+    game.mark_all_active()
+
+
+def population_counts(game):
+    """
+    Return the number of cells of each type, empty cells included.
+    """
+    return game.populations.tolist()
+
+
+def add_rule_arguments(parser):
+    """
+    Add the command-line options that choose the rule set.
+    """
+    parser.add_argument("--types", type=int, default=5, help="cell types, including empty")
+    parser.add_argument("--birth", type=int, nargs="+", default=[3],
+                        help="neighbours needed for a birth, one value or one per live type")
+    parser.add_argument("--survival", type=int, nargs=2, default=[2, 3], metavar=("LEAST", "MOST"),
+                        help="own-type neighbours a live cell survives with")
+    parser.add_argument("--max-neighbor-types", type=int, default=2,
+                        help="most distinct neighbour types, empty included, a live cell survives")
+    parser.add_argument("--tie-break", choices=TIE_BREAKS, default=None,
+                        help="birth tie policy (the hashlife engine needs 'lowest')")
+
+
+def rules_from_args(args, engine="numpy"):
+    """
+    Build the RuleSet chosen by the `add_rule_arguments` options.
+    """
+    tie_break = args.tie_break or ("lowest" if engine == "hashlife" else "random")
+    return RuleSet(args.types, args.birth, tuple(args.survival), args.max_neighbor_types, tie_break)
+
+
+def run(width=150, height=150, generations=1000, seed=None, pattern="random", density=0.3,
+        engine="numpy", report_every=0, checkpoint_path=None, checkpoint_every=0, encoding="rle",
+        resume=None, record=None, keyframe_every=100, **game_kwargs):
+    """
+    Step a board as fast as the engine allows and report how it went.
+
+    Parameters:
+        width (int): The width of the grid.
+        height (int): The height of the grid.
+        generations (int): Number of generations to run.
+        seed (int): Seed for the initial pattern and birth tie-breaks.
+        pattern (str): Initial pattern, see `seed_board`.
+        density (float): Fraction of live cells in the initial pattern.
+        engine (str): Stepping engine of CompetitiveGameOfLife.
+        report_every (int): Also record populations every this many generations (0 = never).
+        checkpoint_path (str): Save the board here at the end, and every
+                               `checkpoint_every` generations if that is set.
+        checkpoint_every (int): Generations between checkpoints (0 = only at the end).
+        encoding (str): Checkpoint grid encoding, one of checkpoint.ENCODINGS.
+        resume (str): Continue from this checkpoint instead of seeding a new board;
+                      width, height, seed and pattern are then ignored.
+        record (str): Stream every generation to this file, see recorder.GenerationRecorder.
+        keyframe_every (int): Generations between full frames in the recording.
+        **game_kwargs: Passed on to CompetitiveGameOfLife (processes, dtype, tie_break, ...).
+
+    With a cycle_window in game_kwargs, a board that settles into a still
+    life or oscillator jumps straight to the last generation.
+
+    Returns:
+        dict: Run parameters, final per-type populations, elapsed time,
+              generations per second and the cycle found, if any.
+    """
+    if engine == "numpy":
+        game_kwargs.setdefault("double_buffer", True)
+    if resume:
+        # Raw checkpoints are memory-mapped, so even huge boards resume at once.
+        game, _ = checkpoint.load(resume, mmap=True, engine=engine, **game_kwargs)
+        pattern = f"resume:{resume}"
+    else:
+        game = CompetitiveGameOfLife(width=width, height=height, engine=engine, seed=seed, **game_kwargs)
+    recorder = GenerationRecorder(record, keyframe_every) if record else None
+    try:
+        if not resume:
+            seed_board(game, pattern, density)
+        game.record_to(recorder)
+        history = []
+        first = game.generation
+        target = first + generations
+        start = time.perf_counter()
+        while game.generation < target:
+            steps = target - game.generation
+            for every in (report_every, checkpoint_every):
+                if every:
+                    steps = min(steps, every - (game.generation - first) % every)
+            game.advance(steps)
+            done = game.generation - first
+            if report_every and (done % report_every == 0 or game.generation == target):
+                history.append({"generation": game.generation, "population": population_counts(game)})
+            if checkpoint_path and checkpoint_every and done % checkpoint_every == 0:
+                checkpoint.save(checkpoint_path, game, encoding)
+        elapsed = time.perf_counter() - start
+        if checkpoint_path:
+            checkpoint.save(checkpoint_path, game, encoding)
+    finally:
+        game.close()
+        if recorder is not None:
+            recorder.close()
+
+    result = {
+        "width": game.width,
+        "height": game.height,
+        "engine": engine,
+        "seed": game.seed,
+        "pattern": pattern,
+        "start_generation": first,
+        "generations": game.generation,
+        "elapsed": elapsed,
+        "generations_per_second": (game.generation - first) / elapsed if elapsed > 0 else float("inf"),
+        "population": population_counts(game),
+        "cycle": {"start": game.cycle[0], "period": game.cycle[1]} if game.cycle else None,
+    }
+    if report_every:
+        result["history"] = history
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the Competitive Game of Life without a display.")
+    parser.add_argument("--width", type=int, default=150)
+    parser.add_argument("--height", type=int, default=150)
+    parser.add_argument("--generations", "-n", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--pattern", default="random",
+                        help=f"one of {', '.join(PATTERNS)}, or the path of a .rle pattern or .npy grid")
+    parser.add_argument("--density", type=float, default=0.3)
+    parser.add_argument("--engine", choices=ENGINES, default="numpy")
+    parser.add_argument("--processes", type=int, default=None, help="workers for the parallel engine")
+    parser.add_argument("--compact", action="store_true", help="store cells as uint8")
+    add_rule_arguments(parser)
+    parser.add_argument("--cycle-window", type=int, default=0,
+                        help="detect cycles up to this period and skip ahead once settled")
+    parser.add_argument("--report-every", type=int, default=0)
+    parser.add_argument("--checkpoint", default=None, help="save the board to this file at the end")
+    parser.add_argument("--checkpoint-every", type=int, default=0, help="also save every this many generations")
+    parser.add_argument("--encoding", choices=checkpoint.ENCODINGS, default="rle",
+                        help="checkpoint grid encoding ('raw' resumes memory-mapped)")
+    parser.add_argument("--resume", default=None, help="continue from this checkpoint")
+    parser.add_argument("--record", default=None, help="stream every generation to this file")
+    parser.add_argument("--keyframe-every", type=int, default=100, help="generations between full frames")
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    args = parser.parse_args(argv)
+
+    rule_kwargs = {}
+    if not args.resume:  # A checkpoint brings its own rules
+        rule_kwargs = {"rules": rules_from_args(args, args.engine), "cell_types": list(range(args.types))}
+
+    result = run(width=args.width, height=args.height, generations=args.generations, seed=args.seed,
+                 pattern=args.pattern, density=args.density, engine=args.engine,
+                 report_every=args.report_every, checkpoint_path=args.checkpoint,
+                 checkpoint_every=args.checkpoint_every, encoding=args.encoding, resume=args.resume,
+                 record=args.record, keyframe_every=args.keyframe_every,
+                 processes=args.processes,
+                 dtype=np.uint8 if args.compact else (None if args.resume else int),
+                 tie_break=args.tie_break, cycle_window=args.cycle_window, **rule_kwargs)
+
+    if args.json:
+        print(json.dumps(result))
+        return
+    for entry in result.get("history", []):
+        print(f"gen {entry['generation']:>8}: {entry['population'][1:]}")
+    print(f"{result['generations'] - result['start_generation']} generations of a "
+          f"{result['width']}x{result['height']} board "
+          f"({result['engine']} engine, seed {result['seed']}) in {result['elapsed']:.3f}s "
+          f"= {result['generations_per_second']:.1f} gen/s")
+    if result["cycle"]:
+        print(f"  settled at generation {result['cycle']['start']} into a "
+              f"period-{result['cycle']['period']} cycle")
+    for cell_type, count in enumerate(result["population"]):
+        print(f"  type {cell_type}: {count}")
+
+
+if __name__ == "__main__":
+    main()
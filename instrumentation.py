@@ -0,0 +1,231 @@
+# instrumentation.py
+
+import collections
+import contextlib
+import csv
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+DEBUG = bool(os.environ.get("GOL_DEBUG"))
+
+_NULL_PHASE = contextlib.nullcontext()
+
+
+def debug(*args):
+    """
+    Print a debug message to stderr, only if debugging is enabled.
+
+    Costs one global lookup when disabled, so it can stay on hot paths.
+    """
+    if DEBUG:
+        print(*args, file=sys.stderr)
+
+
+def set_debug(enabled):
+    """
+    Turn debug output on or off (also on at start-up if GOL_DEBUG is set).
+    """
+    global DEBUG
+    DEBUG = bool(enabled)
+
+
+class _Phase:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.profiler.add(self.name, time.perf_counter() - self.start)
+
+
+class Profiler:
+    def __init__(self, enabled=True, window=300, record=False, max_trace=100_000):
+        """
+        Per-frame phase timers, counters and a rolling history of both.
+
+        Each frame is bracketed by begin_frame/end_frame. Inside it, `phase`
+        times named sections and `count` records values such as populations.
+        The last `window` frames are kept for statistics, histograms and the
+        on-screen overlay; with `record` every frame is also kept for export.
+        A disabled profiler does nothing, and its `phase` is a shared no-op.
+
+        Parameters:
+            enabled (bool): Collect anything at all.
+            window (int): Number of recent frames kept for statistics.
+            record (bool): Keep a per-frame trace for export_csv / export_json.
+            max_trace (int): Most frames kept in the trace; older ones are dropped.
+        """
+        self.enabled = enabled
+        self.window = window
+        self.record = record
+        self.overlay = False
+
+        self.history = collections.defaultdict(lambda: collections.deque(maxlen=window))
+        self.counters = {}
+        self.trace = collections.deque(maxlen=max_trace)
+        self.frames = 0
+
+        self._current = collections.defaultdict(float)
+        self._lock = threading.Lock()  # Phases are also timed on the board worker's thread
+        self._frame_start = None
+        self._font = None
+
+    def phase(self, name):
+        """
+        Context manager adding the time spent inside it to phase `name` of this frame.
+        """
+        if not self.enabled:
+            return _NULL_PHASE
+        return _Phase(self, name)
+
+    def add(self, name, seconds):
+        """
+        Add `seconds` to phase `name` of this frame, e.g. for work timed on another thread.
+
+        Safe to call from any thread: the time lands in whichever frame is open
+        when it is added, never in one end_frame has already closed.
+        """
+        if self.enabled:
+            with self._lock:
+                self._current[name] += seconds
+
+    def count(self, name, value):
+        """
+        Set counter `name` for this frame.
+        """
+        if self.enabled:
+            self.counters[name] = value
+
+    def begin_frame(self):
+        if self.enabled:
+            self._frame_start = time.perf_counter()
+
+    def end_frame(self):
+        """
+        Close the frame, pushing its total time, phases and counters into the history.
+        """
+        if not self.enabled or self._frame_start is None:
+            return
+        now = time.perf_counter()
+        with self._lock:
+            phases, self._current = self._current, collections.defaultdict(float)
+        phases["frame"] = now - self._frame_start
+        for name in set(phases) | set(self.history):
+            self.history[name].append(phases.get(name, 0.0))
+        if self.record:
+            row = {"index": self.frames, "time": now}
+            row.update(phases)
+            row.update(self.counters)
+            self.trace.append(row)
+        self.frames += 1
+        self._frame_start = None
+
+    def stats(self, name="frame"):
+        """
+        Return mean, median, 95th percentile and max of phase `name` over the window, in seconds.
+        """
+        samples = np.fromiter(self.history.get(name, ()), dtype=float)
+        if len(samples) == 0:
+            return {"mean": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+        p50, p95 = np.percentile(samples, [50, 95])
+        return {"mean": float(samples.mean()), "p50": float(p50), "p95": float(p95), "max": float(samples.max())}
+
+    def histogram(self, name="frame", bins=16, limit=1 / 20):
+        """
+        Histogram of phase `name` over the window.
+
+        Parameters:
+            name (str): Phase to bin, "frame" for whole frames.
+            bins (int): Number of equal bins over [0, limit).
+            limit (float): Upper edge in seconds; slower samples land in the last bin.
+
+        Returns:
+            tuple: (counts, edges) as from np.histogram.
+        """
+        samples = np.fromiter(self.history.get(name, ()), dtype=float)
+        return np.histogram(np.minimum(samples, limit * (1 - 1e-9)), bins=bins, range=(0, limit))
+
+    def summary(self):
+        """
+        Return window statistics of every phase and the latest counters.
+        """
+        return {
+            "frames": self.frames,
+            "phases": {name: self.stats(name) for name in self.history},
+            "counters": dict(self.counters),
+        }
+
+    def export_csv(self, path):
+        """
+        Write the recorded trace as CSV, one row per frame.
+        """
+        columns = ["index", "time"]
+        for row in self.trace:
+            columns.extend(key for key in row if key not in columns)
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=columns, restval=0)
+            writer.writeheader()
+            writer.writerows(self.trace)
+
+    def export_json(self, path):
+        """
+        Write the summary and recorded trace as JSON.
+        """
+        with open(path, "w") as f:
+            json.dump({"summary": self.summary(), "trace": list(self.trace)}, f)
+
+    def export(self, path):
+        """
+        Write the trace as CSV or JSON, chosen by the file extension.
+        """
+        if path.endswith(".csv"):
+            self.export_csv(path)
+        else:
+            self.export_json(path)
+
+    def draw_overlay(self, screen, position=(8, 8)):
+        """
+        Draw frame timing, phase means, a frame-time histogram and the counters onto `screen`.
+        """
+        if not self.enabled:
+            return
+        import pygame
+        if self._font is None:
+            pygame.font.init()
+            self._font = pygame.font.Font(None, 18)
+
+        frame = self.stats("frame")
+        lines = [f"{1 / frame['mean'] if frame['mean'] else 0:5.1f} fps  "
+                 f"frame {1000 * frame['mean']:.1f} ms (p95 {1000 * frame['p95']:.1f})"]
+        for name in sorted(self.history):
+            if name != "frame":
+                lines.append(f"{name:>10}: {1000 * self.stats(name)['mean']:.2f} ms")
+        for name, value in self.counters.items():
+            lines.append(f"{name:>10}: {value}")
+
+        x, y = position
+        line_height = self._font.get_linesize()
+        counts, _ = self.histogram()
+        graph_height = 24
+        panel = pygame.Surface((220, line_height * len(lines) + graph_height + 8))
+        panel.set_alpha(200)
+        panel.fill((0, 0, 0))
+        for k, line in enumerate(lines):
+            panel.blit(self._font.render(line, True, (255, 255, 255)), (4, 4 + k * line_height))
+        bar_width = 212 // len(counts)
+        top = counts.max() or 1
+        for k, c in enumerate(counts):
+            h = int(graph_height * c / top)
+            pygame.draw.rect(panel, (120, 220, 120), (4 + k * bar_width, panel.get_height() - 4 - h,
+                                                      bar_width - 1, h))
+        screen.blit(panel, (x, y))
@@ -0,0 +1,143 @@
+# integrators.py
+
+import numpy as np
+
+
+class Integrator:
+    """
+    Base class for fixed-step integrators of x'' = accel(x, x').
+
+    `step_inplace` advances positions and velocities of any shape in place,
+    keeping its scratch arrays between calls, so steady-state stepping does not
+    allocate beyond what `accel` itself does. `step` is the same on copies.
+    """
+    num_buffers = 0
+
+    def __init__(self):
+        self._buffers = []
+
+    def buffers(self, like):
+        """
+        Return this integrator's scratch arrays, reallocated only if the shape changed.
+        """
+        if not self._buffers or self._buffers[0].shape != like.shape:
+            self._buffers = [np.empty_like(like, dtype=float) for _ in range(self.num_buffers)]
+        return self._buffers
+
+    def step(self, x, v, accel, dt, substeps=1):
+        """
+        Return new (x, v) after integrating for dt, leaving the inputs untouched.
+        """
+        return self.step_inplace(np.array(x, dtype=float), np.array(v, dtype=float), accel, dt, substeps)
+
+    def step_inplace(self, x, v, accel, dt, substeps=1):
+        """
+        Integrate x and v in place for dt, split into `substeps` equal substeps.
+
+        Parameters:
+        - x (ndarray): Positions, float array of any shape.
+        - v (ndarray): Velocities, same shape as x.
+        - accel (callable): accel(x, v) -> acceleration, same shape as x.
+        - dt (float): Total time step.
+        - substeps (int): Number of substeps to split dt into.
+
+        Returns:
+        - (x, v): The same arrays, updated.
+        """
+        h = dt / substeps
+        for _ in range(substeps):
+            self._substep(x, v, accel, h)
+        return x, v
+
+    def _substep(self, x, v, accel, h):
+        raise NotImplementedError
+
+
+class ExplicitEuler(Integrator):
+    """
+    x += v*h with the old velocity, then v += a*h. First order, least stable.
+    """
+    num_buffers = 1
+
+    def _substep(self, x, v, accel, h):
+        a, = self.buffers(x)
+        a[...] = accel(x, v)
+        x += v * h
+        v += a * h
+
+
+class SemiImplicitEuler(Integrator):
+    """
+    v += a*h, then x += v*h with the new velocity. Symplectic, and what the
+    boids and Player.update always did before integrators were pluggable.
+    """
+    num_buffers = 1
+
+    def _substep(self, x, v, accel, h):
+        a, = self.buffers(x)
+        a[...] = accel(x, v)
+        v += a * h
+        x += v * h
+
+
+class VelocityVerlet(Integrator):
+    """
+    Second order. With velocity-dependent forces the end-of-step acceleration
+    is evaluated at an Euler-predicted velocity.
+    """
+    num_buffers = 2
+
+    def _substep(self, x, v, accel, h):
+        a0, v_pred = self.buffers(x)
+        a0[...] = accel(x, v)
+        x += v * h + a0 * (0.5 * h * h)
+        np.multiply(a0, h, out=v_pred)
+        v_pred += v
+        v += (a0 + accel(x, v_pred)) * (0.5 * h)
+
+
+class RK4(Integrator):
+    """
+    Classic fourth-order Runge-Kutta on the (x, v) system.
+    """
+    num_buffers = 6
+
+    def _substep(self, x, v, accel, h):
+        k_x, k_v, x_t, v_t, sum_x, sum_v = self.buffers(x)
+        k_x[...] = v
+        k_v[...] = accel(x, v)
+        sum_x[...] = k_x
+        sum_v[...] = k_v
+        for c, weight in ((0.5, 2), (0.5, 2), (1.0, 1)):  # k2, k3, k4
+            np.multiply(k_x, c * h, out=x_t)
+            x_t += x
+            np.multiply(k_v, c * h, out=v_t)
+            v_t += v
+            k_x[...] = v_t
+            k_v[...] = accel(x_t, v_t)
+            for _ in range(weight):
+                sum_x += k_x
+                sum_v += k_v
+        sum_x *= h / 6
+        sum_v *= h / 6
+        x += sum_x
+        v += sum_v
+
+
+INTEGRATORS = {
+    "euler": ExplicitEuler,
+    "semi_implicit": SemiImplicitEuler,
+    "verlet": VelocityVerlet,
+    "rk4": RK4,
+}
+
+
+def get_integrator(name):
+    """
+    Return a new integrator by name, one of INTEGRATORS.
+    """
+    if isinstance(name, Integrator):
+        return name
+    if name not in INTEGRATORS:
+        raise ValueError(f"Unknown integrator {name!r}, expected one of {tuple(INTEGRATORS)}")
+    return INTEGRATORS[name]()
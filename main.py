@@ -2,16 +2,23 @@
 
 import pygame
 from pygame.locals import *
-from multiprocessing import Pool
-from multiprocessing import Process
-from threading import Thread
+import time
 import numpy as np
 from game_logic import CompetitiveGameOfLife
-from BoidIntegrator import BoidIntegrator as BI
-from Projectile import Projectile
+from flock_engine import FlockEngine
+from Projectile import ProjectilePool
+from scheduler import FixedTimestep
+from collisions import CollisionSystem
+from integrators import get_integrator
+from instrumentation import Profiler, debug
+from simulation_worker import SimulationWorker
+import checkpoint
 
 class Game:
-    def __init__(self, width=50, height=50, cell_size=10):
+    def __init__(self, width=50, height=50, cell_size=10, engine="numpy", seed=None,
+                 fps=60, sim_rate=60, physics_rate=60, max_frame_skip=5,
+                 integrator="semi_implicit", profile=False, trace_path=None,
+                 checkpoint_path="checkpoint.gol"):
         """
         Initialize the Pygame window and game state.
         
@@ -19,6 +26,19 @@ class Game:
             width (int): The width of the grid.
             height (int): The height of the grid.
             cell_size (int): The size of each cell in pixels.
+            engine (str): Stepping engine used by CompetitiveGameOfLife.
+            seed (int): Seed for the board's birth tie-breaks.
+            fps (int): Target rendered frames per second.
+            sim_rate (float): Board generations per second while unpaused.
+            physics_rate (float): Player and boid physics substeps per second.
+            max_frame_skip (int): Most consecutive frames left undrawn when
+                                  stepping falls behind the frame budget.
+            integrator (str): Integration scheme for the player and boids, a
+                              name from integrators.INTEGRATORS.
+            profile (bool): Time each phase of the frame; F3 toggles the overlay.
+            trace_path (str): If given, record every frame and write the trace
+                              here on exit (.csv for CSV, otherwise JSON).
+            checkpoint_path (str): File F5 saves the whole game to and F9 loads it from.
         """
         self.width = width
         self.height = height
@@ -26,22 +46,40 @@ class Game:
         self.screen = pygame.display.set_mode((width * cell_size, height * cell_size))
         pygame.display.set_caption("Competitive Game of Life")
         self.clock = pygame.time.Clock()
-        self.game = CompetitiveGameOfLife(width=width, height=height)
+        self.game = CompetitiveGameOfLife(width=width, height=height, engine=engine, seed=seed,
+                                          double_buffer=True)
         self.current_cell_type = 1  # Start with the first cell type (1)
         self.running = True
         self.paused = True
 
+        self.fps = fps
+        # Allow a few frames' worth of backlog before dropping steps.
+        self.sim_clock = FixedTimestep(sim_rate, max_steps=max(1, int(4 * sim_rate / fps)))
+        self.physics_clock = FixedTimestep(physics_rate, max_steps=max(1, int(4 * physics_rate / fps)))
+        self.max_frame_skip = max_frame_skip
+        self.frames_skipped = 0
+
         self.show_boids = False
 
-        self.player = Player(self.screen, (243, 45, 81), np.array([0.0, 0.0])) #width/2, height/2
+        self.player = Player(self.screen, (243, 45, 81), np.array([0.0, 0.0]), integrator) #width/2, height/2
         self.p_ddot = np.zeros((2))
 
-        self.flock_p = BI(self.screen, self.player.x)
-        self.flock_e = BI(self.screen, np.array([width+100, height+200]), col=(0,0,255))
+        self.flocks = FlockEngine(self.screen, integrator=integrator)
+        self.team_p = self.flocks.add_team(self.player.x)
+        self.team_e = self.flocks.add_team(np.array([width+100, height+200]), col=(0,0,255))
 
         self.group_fire = True
 
-        self.bullets = []
+        self.bullets = ProjectilePool(self.screen)
+        self.overlay_drawn = False
+        self.collisions = CollisionSystem(self.screen.get_size())
+        self.hits = np.zeros(len(self.flocks.colors), dtype=int)  # Boids hit, per team
+
+        self.profiler = Profiler(enabled=profile or trace_path is not None, record=trace_path is not None)
+        self.trace_path = trace_path
+        self.checkpoint_path = checkpoint_path
+        # Steps the board in the background; the loop reads its snapshots and queues edits.
+        self.board = SimulationWorker(self.game, self.profiler)
 
     def handle_events(self):
         """
@@ -52,12 +90,15 @@ class Game:
         self.p_ddot = np.array([ (-keys[K_a] or keys[K_d]) , (-keys[K_w] or keys[K_s]) ])  * 500
         # print("acc = ", self.p_ddot)
 
+        painted = []  # Cells under the left mouse button this frame, placed in one write
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 self.running = False
+            elif event.type == pygame.MOUSEMOTION and event.buttons[0]:
+                painted.append(event.pos)  # Every position of a fast drag, not just the last one
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_0:
-                    print("zero")
+                    debug("zero")
                     self.current_cell_type = 0
                 elif event.key == pygame.K_1:
                     self.current_cell_type = 1
@@ -68,11 +109,17 @@ class Game:
                 elif event.key == pygame.K_4:
                     self.current_cell_type = 4
                 elif event.key == pygame.K_r:
-                    self.game.reset_grid()
+                    self.board.reset_grid()
                 elif event.key == pygame.K_q:
                     self.running = False
                 elif event.key == pygame.K_p:
                     self.paused = not self.paused
+                elif event.key == pygame.K_F3:
+                    self.profiler.overlay = self.profiler.enabled and not self.profiler.overlay
+                elif event.key == pygame.K_F5:
+                    self.save(self.checkpoint_path)
+                elif event.key == pygame.K_F9:
+                    self.load(self.checkpoint_path)
                 
                 elif event.key == pygame.K_e:
                     x = ( self.player.x[0] ) // self.cell_size
@@ -81,32 +128,26 @@ class Game:
                     x = int(x)
                     y = int(y)
 
-                    print("x= ",x)
+                    debug("x= ", x)
 
-                    if self.game.grid[int(y), int(x)] == 0:    
-                        self.game.place_cell(x, y, self.current_cell_type)
+                    if self.board.grid[int(y), int(x)] == 0:    
+                        self.board.place_cell(x, y, self.current_cell_type)
 
-                    elif self.game.grid[int(y), int(x)] == self.current_cell_type:
-                        self.game.remove_cell(x, y)
+                    elif self.board.grid[int(y), int(x)] == self.current_cell_type:
+                        self.board.remove_cell(x, y)
                     
-                    elif self.game.grid[int(y), int(x)] != 0:
+                    elif self.board.grid[int(y), int(x)] != 0:
                         pass
                 
                 elif event.key == pygame.K_SPACE:
                     if self.group_fire:
-                        for i in range(0, self.flock_p.X.shape[0]):
-                            self.bullets.append(Projectile(self.screen, self.flock_p.X[i].copy(), self.flock_p.X_dot[i].copy()))
-                            self.bullets.append(Projectile(self.screen, self.player.x.copy(), self.player.x_dot.copy()))
-                    else:
-                        self.bullets.append(Projectile(self.screen, self.player.x.copy(), self.player.x_dot.copy()))
+                        self.bullets.spawn(self.flocks.positions(self.team_p), self.flocks.velocities(self.team_p),
+                                           self.team_p)
+                    self.bullets.spawn(self.player.x, self.player.x_dot, self.team_p)
 
 
             if pygame.mouse.get_pressed()[0]:  # Left mouse button
-                x, y = pygame.mouse.get_pos()
-                x //= self.cell_size
-                y //= self.cell_size
-
-                self.game.place_cell(x, y, self.current_cell_type)
+                painted.append(pygame.mouse.get_pos())
 
                 # if self.game.grid[y, x] == 0:    
                 #     self.game.place_cell(x, y, self.current_cell_type)
@@ -116,64 +157,112 @@ class Game:
                 #     pass
 
             if pygame.mouse.get_pressed()[1]:  # Left mouse button
-                print("Right click")
+                debug("Right click")
                 x, y = pygame.mouse.get_pos()
                 x //= self.cell_size
                 y //= self.cell_size
 
-                if self.game.grid[y, x] == self.current_cell_type:
-                    self.game.remove_cell(x, y)
+                if self.board.grid[y, x] == self.current_cell_type:
+                    self.board.remove_cell(x, y)
                 
-                elif self.game.grid[y, x] != self.current_cell_type:
+                elif self.board.grid[y, x] != self.current_cell_type:
                     pass
 
-    def update(self):
+        if painted:
+            xs, ys = np.array(painted).T // self.cell_size
+            self.board.place_cells(xs, ys, self.current_cell_type)
+
+    def save(self, path, encoding="rle"):
         """
-        Update the game state if the game is not paused.
+        Save the board, flocks, player and projectiles to a checkpoint file.
         """
+        # On the worker, between steps, so a whole generation is saved.
+        self.board.call(checkpoint.save, path, self.game, encoding, {
+            "flocks": self.flocks.get_state(),
+            "player": self.player.get_state(),
+            "bullets": self.bullets.get_state(),
+            "hits": self.hits,
+            "current_cell_type": self.current_cell_type,
+            "show_boids": self.show_boids,
+        })
+
+    def load(self, path):
+        """
+        Restore a checkpoint written by `save`. The board must be the same size.
 
-        player_proc = Thread(target=self.player.update, args=(1/30, self.p_ddot))
-        flockp_proc = Thread(target=self.flock_p.update, args=(1/30, self.player.x))
-        flocke_proc = Thread(target=self.flock_e.update, args=(1/30, None))
-        board_proc = Thread(target=self.game.update_grid, args=(self.paused,))
-
-        # if self.show_boids:
-
-        #     player_proc.start()
-        #     flockp_proc.start()
-        #     flocke_proc.start()
-        # else:
-        board_proc.start()
-        
-
-        # for b in self.bullets:
-        #     b.update()
-
-        #     if b.life_time == 0:
-        #         self.bullets.pop(self.bullets.index(b))
-        #         del b
-        
-        # print(len(self.bullets))
+        A missing or unusable checkpoint is reported and leaves the game as it was.
+        """
+        try:
+            saved = checkpoint.Checkpoint.read(path)
+            extra = {key: saved.extra[key] for key in ("flocks", "player", "bullets", "hits",
+                                                       "current_cell_type", "show_boids")}
+            self.board.call(checkpoint.restore, self.game, saved)  # Checks the board size before changing anything
+        except (OSError, ValueError, KeyError) as error:
+            debug(f"Could not load {path}: {error!r}")
+            return
+        self.flocks.set_state(extra["flocks"])
+        self.player.set_state(extra["player"])
+        self.bullets.set_state(extra["bullets"])
+        self.hits = extra["hits"]
+        self.current_cell_type = extra["current_cell_type"]
+        self.show_boids = extra["show_boids"]
+        self.overlay_drawn = True  # Repaint the whole screen next frame
+
+    def update(self, elapsed):
+        """
+        Advance the game state by `elapsed` seconds of wall-clock time.
 
-    
-        
+        The board runs sim_rate generations per second and the physics
+        physics_rate fixed substeps per second, however many frames that spans.
+        """
+        if self.paused:
+            self.sim_clock.reset()
+            generations = 0
+        else:
+            generations = self.sim_clock.advance(elapsed)
+        substeps = self.physics_clock.advance(elapsed)
+        dt = self.physics_clock.dt
+
+        prof = self.profiler
+        for _ in range(substeps):
+            if self.show_boids:
+                with prof.phase("boids"):
+                    self.player.update(dt, self.p_ddot)
+                    self.flocks.update(dt, {self.team_p: self.player.x})
+            with prof.phase("bullets"):
+                self.bullets.update(dt)
+            with prof.phase("collisions"):
+                self.hits += self.collisions.resolve(self.bullets, self.flocks, self.board, self.cell_size,
+                                                     boids=self.show_boids)
+        # If the board is still busy with earlier generations, these ones are
+        # dropped: the simulation slows down rather than the frame rate.
+        self.board.request(generations)
 
     def draw(self):
         """
         Draw the current game state to the screen.
         """
-        
+        overlay = self.show_boids or len(self.bullets) > 0 or self.profiler.overlay
+        if not overlay and not self.overlay_drawn:
+            # Only the board is on screen, so redraw just the tiles that changed.
+            rects = self.board.draw_dirty(self.screen, cell_size=self.cell_size, paused=self.paused)
+            if rects:
+                pygame.display.update(rects)
+            return
+        # Repaint everything while sprites are up, and once more to erase them.
+        self.overlay_drawn = overlay
+
         self.screen.fill((255, 255, 255))  # Fill background with white
-        self.game.draw_grid(self.screen, cell_size=self.cell_size, paused=self.paused)
+        self.board.draw_grid(self.screen, cell_size=self.cell_size, paused=self.paused)  # Also clears the dirty tiles
         
-        # for b in self.bullets:
-            
-        #     b.draw()
-
-        # if self.show_boids:
-        #     self.flock_p.draw()
-        #     self.flock_e.draw()
-        #     self.player.draw()
+        self.bullets.draw()
+
+        if self.show_boids:
+            self.flocks.draw()
+            self.player.draw()
+
+        if self.profiler.overlay:
+            self.profiler.draw_overlay(self.screen)
         
         pygame.display.flip()
 
@@ -181,19 +270,47 @@ class Game:
         """
         The main game loop that runs the game.
         """
+        prof = self.profiler
+        previous = time.perf_counter()
         while self.running:
-            self.flock_e.set_adversary_positions(self.flock_p.X)
-            self.handle_events()
-            self.update()
-            self.draw()
-            self.clock.tick(60)  # Adjust the frame rate to control the speed of the game
-
+            now = time.perf_counter()
+            elapsed, previous = now - previous, now
+            prof.begin_frame()
+
+            with prof.phase("events"):
+                self.handle_events()
+            with prof.phase("update"):
+                self.update(elapsed)
+
+            # Under load, let stepping catch up before spending time on drawing.
+            behind = time.perf_counter() - now > 1 / self.fps
+            if behind and self.frames_skipped < self.max_frame_skip:
+                self.frames_skipped += 1
+            else:
+                self.frames_skipped = 0
+                with prof.phase("draw"):
+                    self.draw()
+
+            if prof.enabled:
+                snapshot = self.board.latest()
+                prof.count("population", snapshot.grid.size - int(snapshot.populations[0]))
+                prof.count("boids", self.flocks.N if self.show_boids else 0)
+                prof.count("bullets", len(self.bullets))
+            with prof.phase("idle"):
+                self.clock.tick(self.fps)
+            prof.end_frame()
+
+        self.board.close()
+        self.game.close()
+        if self.trace_path:
+            prof.export(self.trace_path)
         pygame.quit()
 
 class Player:
 
-    def __init__(self, screen, col, x_0):
+    def __init__(self, screen, col, x_0, integrator="semi_implicit"):
         self.screen = screen
+        self.integrator = get_integrator(integrator)
         self.color = col
         rng = np.random.default_rng()
         self.x = x_0
@@ -203,15 +320,20 @@ class Player:
         # print("v = ", self.x_dot)
 
 
-    def update(self, dt, u):
-        self.x_dot += u*dt
-        if np.linalg.norm(self.x_dot) > 100:
-            self.x_dot = 100* (self.x_dot / np.linalg.norm(self.x_dot))
+    def get_state(self):
+        return {"x": self.x.copy(), "x_dot": self.x_dot.copy()}
 
-        self.x += self.x_dot*dt
-        
+    def set_state(self, state):
+        self.x = np.array(state["x"], dtype=float)
+        self.x_dot = np.array(state["x_dot"], dtype=float)
+
+    def update(self, dt, u):
+        self.integrator.step_inplace(self.x, self.x_dot, lambda x, v: u, dt)
+        speed = np.linalg.norm(self.x_dot)
+        if speed > 100:
+            self.x_dot *= 100 / speed
 
-        self.x = self.x % self.screen.get_width()
+        self.x %= self.screen.get_width()
 
 
     def draw(self):
@@ -0,0 +1,119 @@
+# parallel_engine.py
+
+import numpy as np
+from multiprocessing import Pool, shared_memory
+import os
+
+from game_logic import next_generation
+
+# Views onto the shared front/back buffers, set up once per worker process.
+_worker_buffers = None
+_worker_memory = None
+_worker_rules = None
+
+
+def _init_worker(names, shape, dtype, rules=None):
+    """
+    Attach a pool worker to the shared grid buffers, and keep the rule set it steps with.
+    """
+    global _worker_buffers, _worker_memory, _worker_rules
+    _worker_memory = [shared_memory.SharedMemory(name=name) for name in names]
+    _worker_buffers = [np.ndarray(shape, dtype=dtype, buffer=shm.buf) for shm in _worker_memory]
+    _worker_rules = rules
+
+
+def _step_strip(task):
+    """
+    Compute rows r0..r1 of the next generation from the shared source buffer.
+
+    The rows just above and below the strip (wrapping around the board) are read
+    straight out of shared memory, which is all the halo exchange there is.
+    """
+    src_index, r0, r1, num_types, seed, generation, tie_break = task
+    src = _worker_buffers[src_index]
+    dst = _worker_buffers[1 - src_index]
+    height = src.shape[0]
+    if r0 > 0 and r1 < height:
+        band = src[r0 - 1:r1 + 1]
+    else:
+        band = src[np.arange(r0 - 1, r1 + 1) % height]
+    padded = np.pad(band, ((0, 0), (1, 1)), mode="wrap")
+    dst[r0:r1] = next_generation(padded, num_types, seed, generation, y0=r0, tie_break=tie_break,
+                                 rules=_worker_rules)
+
+
+class ParallelStepper:
+    def __init__(self, height, width, dtype=int, processes=None, rules=None):
+        """
+        Step a board over a process pool, one row strip per worker.
+
+        The board lives in two shared-memory buffers; each generation reads the
+        front one and writes the back one, then the two are swapped.
+
+        Parameters:
+            height (int): The height of the grid.
+            width (int): The width of the grid.
+            dtype: Cell dtype of the grid.
+            processes (int): Number of worker processes, os.cpu_count() if None.
+            rules (RuleSet): Rules to step with, sent to each worker once; the
+                             standard rules if None.
+        """
+        self.shape = (height, width)
+        self.dtype = np.dtype(dtype)
+        self.processes = processes or os.cpu_count() or 1
+
+        nbytes = max(height * width * self.dtype.itemsize, 1)
+        self._memory = [shared_memory.SharedMemory(create=True, size=nbytes) for _ in range(2)]
+        self._buffers = [np.ndarray(self.shape, dtype=self.dtype, buffer=shm.buf) for shm in self._memory]
+        for buffer in self._buffers:
+            buffer[:] = 0
+        self._front = 0
+
+        strips = min(self.processes, height)
+        bounds = np.linspace(0, height, strips + 1).astype(int)
+        self._strips = [(r0, r1) for r0, r1 in zip(bounds[:-1], bounds[1:]) if r1 > r0]
+
+        self._pool = Pool(self.processes, initializer=_init_worker,
+                          initargs=([shm.name for shm in self._memory], self.shape, self.dtype.str, rules))
+
+    @property
+    def grid(self):
+        """
+        The current generation, as a view onto shared memory.
+        """
+        return self._buffers[self._front]
+
+    def step(self, num_types, seed, generation, tie_break="random"):
+        """
+        Advance the shared board by one generation.
+
+        Parameters:
+            num_types (int): Number of cell types, including the empty type 0.
+            seed (int): Board seed for birth tie-breaks.
+            generation (int): The generation being computed.
+            tie_break (str): Birth tie policy, see game_logic.TIE_BREAKS, if the
+                             stepper has no rule set.
+        """
+        tasks = [(self._front, r0, r1, num_types, seed, generation, tie_break) for r0, r1 in self._strips]
+        self._pool.map(_step_strip, tasks)
+        self._front = 1 - self._front
+
+    def close(self):
+        """
+        Shut the pool down and release the shared memory.
+        """
+        if self._pool is None:
+            return
+        self._pool.close()
+        self._pool.join()
+        self._pool = None
+        self._buffers = None
+        for shm in self._memory:
+            shm.close()
+            shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,86 @@
+# patterns.py
+
+import re
+
+import numpy as np
+
+# Run count, then a cell state: b or . empty, o or A-X live, p-y followed by A-X
+# for states above 24, $ end of row, ! end of pattern.
+_TOKEN = re.compile(r"(\d*)([bo.$!]|[p-y]?[A-X])")
+
+
+def _state(tag):
+    """
+    Return the cell state an RLE tag stands for.
+    """
+    if tag in "b.":
+        return 0
+    if tag == "o":
+        return 1
+    if len(tag) == 1:
+        return ord(tag) - ord("A") + 1
+    state = (ord(tag[0]) - ord("p") + 1) * 24 + ord(tag[1]) - ord("A") + 1
+    if state > 255:
+        raise ValueError(f"RLE state {tag!r} is above 255")
+    return state
+
+
+def parse_rle(text):
+    """
+    Parse a pattern in run-length encoded (RLE) format.
+
+    Both two-state patterns (b empty, o alive) and Golly's multi-state ones
+    (. empty, A-X and pA-yX for states 1-255) are read; "#" comment lines and
+    the "x = .., y = .." header are skipped, and rows shorter than the widest
+    one are padded with empty cells.
+
+    Parameters:
+        text (str): The RLE text.
+
+    Returns:
+        ndarray: uint8 cell states of shape (rows, columns); o reads as state 1.
+    """
+    width = height = 0
+    body = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("x"):
+            header = dict(re.findall(r"(\w+)\s*=\s*([^,\s]+)", line))
+            width, height = int(header.get("x", 0)), int(header.get("y", 0))
+            continue
+        body.append(line)
+    body = re.sub(r"\s", "", "".join(body)).split("!")[0]
+
+    rows, row = [], []
+    position = 0
+    for match in _TOKEN.finditer(body):
+        if match.start() != position:
+            raise ValueError(f"Unexpected {body[position:match.start()]!r} in RLE pattern")
+        position = match.end()
+        count, tag = int(match.group(1) or 1), match.group(2)
+        if tag == "$":
+            rows.append(row)
+            rows.extend([] for _ in range(count - 1))
+            row = []
+        else:
+            row.extend([_state(tag)] * count)
+    if body[position:].strip():
+        raise ValueError(f"Unexpected {body[position:]!r} in RLE pattern")
+    rows.append(row)
+
+    width = max([width] + [len(r) for r in rows])
+    height = max(height, len(rows))
+    cells = np.zeros((height, width), dtype=np.uint8)
+    for y, r in enumerate(rows):
+        cells[y, :len(r)] = r
+    return cells
+
+
+def read_rle(path):
+    """
+    Read an RLE pattern file, see `parse_rle`.
+    """
+    with open(path) as f:
+        return parse_rle(f.read())
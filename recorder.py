@@ -0,0 +1,238 @@
+# recorder.py
+
+import bisect
+import queue
+import struct
+import threading
+import zlib
+
+import numpy as np
+
+MAGIC = b"GOLREC\0\0"
+INDEX_MAGIC = b"GOLRIDX\0"
+VERSION = 1
+
+# magic, version, height, width, keyframe interval, grid dtype
+HEADER = struct.Struct("<8sHIIQ8s")
+# generation, kind, payload length
+RECORD = struct.Struct("<QBI")
+# keyframe index offset, keyframe count, magic
+TRAILER = struct.Struct("<QQ8s")
+INDEX_ENTRY = np.dtype([("generation", "<u8"), ("offset", "<u8")])
+
+KEYFRAME, DELTA = 0, 1
+
+
+def encode_delta(previous, current, level=1):
+    """
+    Compress the cells that differ between two frames of the same little-endian dtype.
+
+    The payload is the number of changed cells, the gaps between their flat
+    indices and their new values, deflated. Slowly changing boards give
+    mostly small gaps, which deflate well.
+    """
+    changed = np.flatnonzero(previous.ravel() != current.ravel())
+    gaps = np.diff(changed, prepend=0).astype("<u4")
+    values = current.ravel()[changed]
+    return zlib.compress(struct.pack("<Q", len(changed)) + gaps.tobytes() + values.tobytes(), level)
+
+
+def apply_delta(grid, payload):
+    """
+    Apply an `encode_delta` payload to `grid` in place.
+    """
+    data = zlib.decompress(payload)
+    count, = struct.unpack_from("<Q", data)
+    gaps = np.frombuffer(data, dtype="<u4", count=count, offset=8)
+    values = np.frombuffer(data, dtype=grid.dtype, count=count, offset=8 + 4 * count)
+    grid.ravel()[np.cumsum(gaps, dtype=np.int64)] = values
+
+
+class GenerationRecorder:
+    def __init__(self, path, keyframe_every=100, max_pending=64, level=1):
+        """
+        Stream generations to a file as keyframes and changed-cell deltas.
+
+        `record` only copies the grid onto a queue; a background thread diffs
+        each frame against the previous one, deflates it and writes it, so the
+        stepping thread never waits on compression or disk. Every
+        `keyframe_every` generations a whole frame is written instead, and the
+        keyframes are indexed in a footer for `ReplayReader.seek`.
+
+        Parameters:
+            path (str): Output file.
+            keyframe_every (int): Generations between keyframes.
+            max_pending (int): Frames queued before `record` waits for the writer.
+            level (int): zlib compression level.
+        """
+        self.path = path
+        self.keyframe_every = keyframe_every
+        self.level = level
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._file = None
+        self._shape = None
+        self._error = None
+        self._thread = None
+
+    def record(self, generation, grid):
+        """
+        Queue the grid at `generation` for writing.
+        """
+        if self._error is not None:
+            raise self._error
+        if self._thread is None:
+            self._open(grid)
+        elif grid.shape != self._shape:
+            raise ValueError(f"Recording a {self._shape} board, got a frame of shape {grid.shape}")
+        self._queue.put((generation, grid.astype(self._dtype)))  # A copy the writer can keep
+
+    def _open(self, grid):
+        self._shape = grid.shape
+        self._dtype = grid.dtype.newbyteorder("<") if grid.dtype.itemsize > 1 else grid.dtype
+        self._file = open(self.path, "wb")
+        self._file.write(HEADER.pack(MAGIC, VERSION, grid.shape[0], grid.shape[1], self.keyframe_every,
+                                     self._dtype.str.encode()))
+        self._thread = threading.Thread(target=self._write_loop, daemon=True)
+        self._thread.start()
+
+    def _write_loop(self):
+        previous = None
+        last_keyframe = None
+        index = []
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    break
+                generation, grid = item
+                offset = self._file.tell()
+                if last_keyframe is None or generation - last_keyframe >= self.keyframe_every:
+                    kind = KEYFRAME
+                    payload = zlib.compress(grid.tobytes(), self.level)
+                    last_keyframe = generation
+                    index.append((generation, offset))
+                else:
+                    kind = DELTA
+                    payload = encode_delta(previous, grid, self.level)
+                self._file.write(RECORD.pack(generation, kind, len(payload)))
+                self._file.write(payload)
+                previous = grid
+            index_offset = self._file.tell()
+            self._file.write(np.array(index, dtype=INDEX_ENTRY).tobytes())
+            self._file.write(TRAILER.pack(index_offset, len(index), INDEX_MAGIC))
+        except Exception as error:  # Reported to the stepping thread on its next call
+            self._error = error
+            while self._queue.get() is not None:  # Unblock any waiting record() until close()
+                pass
+        finally:
+            self._file.close()
+
+    def close(self):
+        """
+        Write everything still queued, then the keyframe index, and close the file.
+        """
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        if self._error is not None:
+            raise self._error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ReplayReader:
+    def __init__(self, path):
+        """
+        Random access to a GenerationRecorder file.
+
+        Seeking decodes the nearest keyframe at or before the target and
+        applies the deltas after it. Files whose writer never closed (no
+        index footer) are indexed by scanning their records once.
+
+        Parameters:
+            path (str): Recording to read.
+        """
+        self._file = open(path, "rb")
+        magic, version, height, width, self.keyframe_every, dtype = HEADER.unpack(self._file.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a recording")
+        if version > VERSION:
+            raise ValueError(f"{path} is recording version {version}, this reader handles {VERSION}")
+        self.shape = (height, width)
+        self.dtype = np.dtype(dtype.rstrip(b"\0").decode())
+        self._end, index = self._read_index()
+        self.keyframes = [int(g) for g in index["generation"]]
+        self._offsets = [int(o) for o in index["offset"]]
+
+    def _read_index(self):
+        self._file.seek(0, 2)
+        size = self._file.tell()
+        if size >= HEADER.size + TRAILER.size:
+            self._file.seek(size - TRAILER.size)
+            index_offset, count, magic = TRAILER.unpack(self._file.read(TRAILER.size))
+            if magic == INDEX_MAGIC:
+                self._file.seek(index_offset)
+                index = np.frombuffer(self._file.read(count * INDEX_ENTRY.itemsize), dtype=INDEX_ENTRY)
+                return index_offset, index
+        # No footer: the writer did not finish, so index whatever whole records there are.
+        entries = [(generation, offset) for generation, kind, offset, _ in self._scan(HEADER.size, size)
+                   if kind == KEYFRAME]
+        return size, np.array(entries, dtype=INDEX_ENTRY)
+
+    def _scan(self, offset, end):
+        """
+        Yield (generation, kind, offset, payload) for every whole record in [offset, end).
+        """
+        while offset + RECORD.size <= end:
+            self._file.seek(offset)  # Other scans may have moved the file in between
+            generation, kind, length = RECORD.unpack(self._file.read(RECORD.size))
+            if offset + RECORD.size + length > end:
+                return
+            yield generation, kind, offset, self._file.read(length)
+            offset += RECORD.size + length
+
+    def _frames(self, offset, stop=None):
+        """
+        Yield (generation, grid) from the keyframe at `offset`, up to generation `stop`.
+        """
+        grid = None
+        for generation, kind, _, payload in self._scan(offset, self._end):
+            if stop is not None and generation > stop:
+                return
+            if kind == KEYFRAME:
+                grid = np.frombuffer(zlib.decompress(payload), dtype=self.dtype).reshape(self.shape).copy()
+            else:
+                apply_delta(grid, payload)
+            yield generation, grid
+
+    def __iter__(self):
+        """
+        Yield (generation, grid) for every recorded frame. The grid is reused between frames.
+        """
+        if self._offsets:
+            yield from self._frames(self._offsets[0])
+
+    def seek(self, generation):
+        """
+        Return (generation, grid) for the last recorded frame at or before `generation`.
+        """
+        k = bisect.bisect_right(self.keyframes, generation) - 1
+        if k < 0:
+            raise ValueError(f"Generation {generation} is before the first keyframe")
+        for found in self._frames(self._offsets[k], stop=generation):
+            pass
+        return found
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
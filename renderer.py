@@ -0,0 +1,104 @@
+# renderer.py
+
+import numpy as np
+import pygame
+
+from game_logic import TILE_SIZE
+
+PAUSED_EMPTY_COLOR = (148, 147, 150)
+
+
+class GridRenderer:
+    def __init__(self, colors, paused_color=PAUSED_EMPTY_COLOR):
+        """
+        Draw a grid by mapping it through a colour lookup table and blitting it once.
+
+        Parameters:
+            colors (dict): Colour of each cell type, keyed by type.
+            paused_color (tuple): Colour of empty cells while the game is paused.
+        """
+        self.lut = np.zeros((max(colors) + 1, 3), dtype=np.uint8)
+        for cell_type, color in colors.items():
+            self.lut[cell_type] = color
+        self.empty_color = self.lut[0].copy()
+        self.paused_color = np.array(paused_color, dtype=np.uint8)
+
+        self._pixels = None   # (W, H, 3) array in pygame's x-major layout
+        self._surface = None  # One pixel per cell
+        self._scaled = None   # cell_size pixels per cell
+        self._drawn_paused = None
+
+    def _allocate(self, shape, cell_size):
+        height, width = shape
+        self._pixels = np.zeros((width, height, 3), dtype=np.uint8)
+        self._surface = pygame.Surface((width, height))
+        if cell_size != 1:
+            self._scaled = pygame.Surface((width * cell_size, height * cell_size))
+        else:
+            self._scaled = self._surface
+        self._cell_size = cell_size
+
+    def render(self, grid, cell_size=10, paused=False):
+        """
+        Return a Surface showing the grid at `cell_size` pixels per cell.
+
+        The returned Surface is reused by the next call.
+
+        Parameters:
+            grid (ndarray): Cell types, shape (H, W).
+            cell_size (int): The size of each cell in pixels.
+            paused (bool): Draw empty cells in the paused colour.
+        """
+        if (self._pixels is None or self._pixels.shape[:2] != grid.shape[::-1]
+                or self._cell_size != cell_size):
+            self._allocate(grid.shape, cell_size)
+
+        self.lut[0] = self.paused_color if paused else self.empty_color
+        self._drawn_paused = paused
+        np.take(self.lut, grid.T, axis=0, out=self._pixels)
+        pygame.surfarray.blit_array(self._surface, self._pixels)
+        if self._scaled is not self._surface:
+            pygame.transform.scale(self._surface, self._scaled.get_size(), self._scaled)
+        return self._scaled
+
+    def draw(self, screen, grid, cell_size=10, paused=False):
+        """
+        Blit the grid onto `screen` at its top-left corner.
+        """
+        screen.blit(self.render(grid, cell_size, paused), (0, 0))
+
+    def draw_tiles(self, screen, grid, tiles, cell_size=10, paused=False):
+        """
+        Redraw only the given TILE_SIZE tiles of the grid onto `screen`.
+
+        Consecutive dirty tiles in a tile row are drawn as one strip.
+
+        Parameters:
+            screen (pygame.Surface): The Pygame screen to draw on.
+            grid (ndarray): Cell types, shape (H, W).
+            tiles (ndarray): Boolean mask of tiles to redraw, see CompetitiveGameOfLife.pop_dirty_tiles.
+            cell_size (int): The size of each cell in pixels.
+            paused (bool): Draw empty cells in the paused colour.
+
+        Returns:
+            list: The pygame.Rect areas that were redrawn.
+        """
+        if paused != self._drawn_paused:  # The palette changed, so every tile did
+            tiles = np.ones_like(tiles)
+            self._drawn_paused = paused
+        self.lut[0] = self.paused_color if paused else self.empty_color
+
+        height, width = grid.shape
+        rects = []
+        for ty in range(tiles.shape[0]):
+            row = tiles[ty]
+            # Start and end of every run of dirty tiles in this row.
+            edges = np.flatnonzero(np.diff(np.concatenate(([False], row, [False])).astype(np.int8)))
+            for start, end in zip(edges[::2], edges[1::2]):
+                y0, y1 = ty * TILE_SIZE, min((ty + 1) * TILE_SIZE, height)
+                x0, x1 = start * TILE_SIZE, min(end * TILE_SIZE, width)
+                strip = pygame.surfarray.make_surface(self.lut[grid[y0:y1, x0:x1].T])
+                size = ((x1 - x0) * cell_size, (y1 - y0) * cell_size)
+                rect = screen.blit(pygame.transform.scale(strip, size), (x0 * cell_size, y0 * cell_size))
+                rects.append(rect)
+        return rects
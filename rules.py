@@ -0,0 +1,254 @@
+# rules.py
+
+import colorsys
+from functools import lru_cache
+from math import comb
+
+import numpy as np
+
+# "random" picks among tied birth types with a seeded hash of the cell and
+# generation; "lowest" always picks the lowest tied type, which depends on
+# nothing but the neighbourhood.
+TIE_BREAKS = ("random", "lowest")
+
+NUM_NEIGHBORS = 8
+
+# Largest transition table a rule set may compile to, in entries.
+MAX_TABLE_SIZE = 64_000_000
+
+# Largest table indexed directly by own type and base-9 neighbour counts, see RuleSet.codes.
+MAX_DIRECT_TABLE = 4_000_000
+
+
+def num_signatures(num_live_types, budget=NUM_NEIGHBORS):
+    """
+    Number of distinct neighbourhood count signatures: ways to split at most
+    `budget` neighbours among `num_live_types` live types.
+    """
+    return comb(budget + num_live_types, num_live_types)
+
+
+@lru_cache(maxsize=None)
+def _signatures(num_live_types, budget=NUM_NEIGHBORS):
+    """
+    Every tuple of `num_live_types` counts summing to at most `budget`, in rank order.
+    """
+    if num_live_types == 0:
+        return np.zeros((1, 0), dtype=np.uint8)
+    blocks = []
+    for c in range(budget + 1):
+        rest = _signatures(num_live_types - 1, budget - c)
+        blocks.append(np.concatenate([np.full((len(rest), 1), c, dtype=np.uint8), rest], axis=1))
+    return np.concatenate(blocks)
+
+
+class RuleSet:
+    def __init__(self, num_types=5, birth=3, survival=(2, 3), max_neighbor_types=2, tie_break="random"):
+        """
+        A competitive life rule, compiled into a transition lookup table.
+
+        Each cell's next type depends only on its own type and its signature,
+        the number of neighbours of each live type. The signatures are ranked
+        0..S-1 in the combinatorial number system, and `table[own, rank]` holds
+        the next type for every pair, or `tie` where a birth has several
+        equally strong candidates and the tie-break has to pick by position.
+
+        The default is the game's standard rule: an empty cell is born as the
+        majority type among its neighbours when that type has 3 or more of
+        them; a live cell survives with 2-3 neighbours of its own type and at
+        most 2 distinct types (empty included) around it.
+
+        Parameters:
+            num_types (int): Number of cell types, including the empty type 0.
+            birth (int or sequence): Least neighbours of one type for an empty cell
+                                     to be born as that type; one value for every
+                                     live type, or one per live type.
+            survival (tuple or sequence): Inclusive (least, most) neighbours of its
+                                          own type a live cell survives with; one
+                                          pair for every live type, or one per live type.
+            max_neighbor_types (int): A live cell dies when more distinct types
+                                      than this, empty included, surround it.
+            tie_break (str): Birth tie policy, one of TIE_BREAKS.
+        """
+        if num_types < 2:
+            raise ValueError("A rule set needs the empty type and at least one live type")
+        if tie_break not in TIE_BREAKS:
+            raise ValueError(f"Unknown tie_break {tie_break!r}, expected one of {TIE_BREAKS}")
+        num_live = num_types - 1
+        size = num_types * num_signatures(num_live)
+        if size > MAX_TABLE_SIZE:
+            raise ValueError(f"{num_types} cell types need a {size}-entry transition table, "
+                             f"more than MAX_TABLE_SIZE ({MAX_TABLE_SIZE})")
+
+        self.num_types = num_types
+        self.birth = np.broadcast_to(np.asarray(birth, dtype=np.intp), (num_live,)).copy()
+        self.survival = np.broadcast_to(np.asarray(survival, dtype=np.intp), (num_live, 2)).copy()
+        if (self.birth < 1).any():
+            raise ValueError("Birth needs at least one neighbour of the new type")
+        self.max_neighbor_types = max_neighbor_types
+        self.tie_break = tie_break
+        self.tie = num_types  # Table entry for a tie the tie-break must settle
+
+        # offsets[t, prefix * 9 + c]: how far the rank moves when live type t has
+        # c neighbours after `prefix` neighbours of the lower types.
+        self._offsets = np.zeros((num_live, (NUM_NEIGHBORS + 1) ** 2), dtype=np.intp)
+        for t in range(num_live):
+            remaining = num_live - t - 1
+            for prefix in range(NUM_NEIGHBORS + 1):
+                for c in range(NUM_NEIGHBORS + 1 - prefix):
+                    self._offsets[t, prefix * (NUM_NEIGHBORS + 1) + c] = sum(
+                        num_signatures(remaining, NUM_NEIGHBORS - prefix - v) for v in range(c))
+
+        self.table = self._compile()
+        self._tables = {}
+
+        # With few types, the own type and the counts read as base-9 digits index
+        # an expanded copy of the table directly, which is much cheaper than ranking.
+        self._direct = None
+        self.code_dtype = np.dtype(np.intp)
+        if num_types * (NUM_NEIGHBORS + 1) ** num_live <= MAX_DIRECT_TABLE:
+            digits = np.indices((NUM_NEIGHBORS + 1,) * num_live).reshape(num_live, -1)
+            possible = digits.sum(axis=0) <= NUM_NEIGHBORS
+            ranks = np.zeros(digits.shape[1], dtype=np.intp)  # Impossible codes are never looked up
+            ranks[possible] = self.rank(digits[:, possible])
+            self._direct = self.table[:, ranks]
+            self.code_dtype = np.min_scalar_type(self._direct.size - 1)
+        self.direct = self._direct is not None
+
+    def _compile(self):
+        signatures = _signatures(self.num_types - 1).astype(np.intp)
+        empty = NUM_NEIGHBORS - signatures.sum(axis=1)
+        distinct = (signatures > 0).sum(axis=1) + (empty > 0)
+
+        dtype = np.min_scalar_type(self.tie)
+        table = np.zeros((self.num_types, len(signatures)), dtype=dtype)
+
+        candidates = self.candidates(signatures.T)
+        num_candidates = candidates.sum(axis=0)
+        lowest = candidates.argmax(axis=0) + 1
+        table[0] = np.where(num_candidates == 0, 0, lowest)
+        if self.tie_break == "random":
+            table[0, num_candidates > 1] = self.tie
+
+        for t in range(1, self.num_types):
+            same = signatures[:, t - 1]
+            least, most = self.survival[t - 1]
+            survives = (same >= least) & (same <= most) & (distinct <= self.max_neighbor_types)
+            table[t] = np.where(survives, t, 0)
+        return table
+
+    def candidates(self, live_counts):
+        """
+        Return which live types an empty cell could be born as.
+
+        Parameters:
+            live_counts (ndarray): Neighbour counts of the live types, shape (num_types - 1, ...).
+
+        Returns:
+            ndarray: Boolean array of the same shape; several True entries in a
+                     column are a tie.
+        """
+        live_counts = np.asarray(live_counts)
+        birth = self.birth.reshape((-1,) + (1,) * (live_counts.ndim - 1))
+        eligible = live_counts >= birth
+        # Zero never matches an eligible count (birth needs at least one), and
+        # unlike -1 it fits unsigned counts.
+        strongest = np.where(eligible, live_counts, 0).max(axis=0)
+        return eligible & (live_counts == strongest)
+
+    def rank(self, live_counts, out=None, buffers=None):
+        """
+        Return the signature rank of every cell.
+
+        Parameters:
+            live_counts (ndarray): Neighbour counts of the live types, shape (num_types - 1, ...).
+            out (ndarray): Optional intp array of shape live_counts.shape[1:] for the result.
+            buffers (tuple): Optional two more intp arrays of that shape, so ranking
+                             allocates nothing.
+        """
+        shape = live_counts.shape[1:]
+        if out is None:
+            out = np.empty(shape, dtype=np.intp)
+        prefix, index = buffers if buffers is not None else (np.empty(shape, np.intp), np.empty(shape, np.intp))
+        out.fill(0)
+        prefix.fill(0)
+        for t, offsets in enumerate(self._offsets):
+            np.multiply(prefix, NUM_NEIGHBORS + 1, out=index)
+            np.add(index, live_counts[t], out=index)
+            np.add(prefix, live_counts[t], out=prefix)
+            np.take(offsets, index, out=index)
+            np.add(out, index, out=out)
+        return out
+
+    def codes(self, cell_types, live_counts, out=None, buffers=None):
+        """
+        Return every cell's flat index into `table_as`, from its own type and its signature.
+
+        Parameters:
+            cell_types (ndarray): The cells' own types.
+            live_counts (ndarray): Neighbour counts of the live types, shape (num_types - 1,) + cell_types.shape.
+            out (ndarray): Optional array for the result, of dtype `code_dtype` or intp.
+            buffers (tuple): Optional two intp arrays of the same shape, for `rank`
+                             when the table is too large to index directly.
+        """
+        if out is None:
+            out = np.empty(cell_types.shape, dtype=self.code_dtype)
+        if self._direct is not None:
+            np.copyto(out, cell_types, casting="unsafe")
+            for counts in live_counts:
+                np.multiply(out, NUM_NEIGHBORS + 1, out=out)
+                np.add(out, counts, out=out)
+            return out
+        if buffers is None:
+            buffers = (np.empty(cell_types.shape, np.intp), np.empty(cell_types.shape, np.intp))
+        self.rank(live_counts, out=out, buffers=buffers)
+        own = buffers[0]
+        np.copyto(own, cell_types, casting="unsafe")
+        np.multiply(own, self.table.shape[1], out=own)
+        return np.add(out, own, out=out)
+
+    def table_as(self, dtype):
+        """
+        Return the transition table flattened for `codes` and cast to `dtype`,
+        for gathering straight into a grid.
+        """
+        dtype = np.dtype(dtype)
+        if dtype not in self._tables:
+            table = self.table if self._direct is None else self._direct
+            self._tables[dtype] = table.astype(dtype).ravel()
+        return self._tables[dtype]
+
+    def lookup(self, cell_type, live_counts):
+        """
+        Return the table entry for one cell: its next type, or `tie`.
+
+        Parameters:
+            cell_type (int): The cell's own type.
+            live_counts (sequence): Its neighbour count for each live type.
+        """
+        rank, prefix = 0, 0
+        for t, c in enumerate(live_counts):
+            rank += int(self._offsets[t, prefix * (NUM_NEIGHBORS + 1) + c])
+            prefix += c
+        return int(self.table[cell_type, rank])
+
+    def __repr__(self):
+        return (f"RuleSet(num_types={self.num_types}, birth={self.birth.tolist()}, "
+                f"survival={self.survival.tolist()}, max_neighbor_types={self.max_neighbor_types}, "
+                f"tie_break={self.tie_break!r})")
+
+
+@lru_cache(maxsize=None)
+def standard_rules(num_types=5, tie_break="random"):
+    """
+    Return the (shared) standard rule set for the given number of cell types.
+    """
+    return RuleSet(num_types, tie_break=tie_break)
+
+
+def type_color(cell_type):
+    """
+    A distinct colour for cell types beyond the built-in palette, spaced by the golden ratio in hue.
+    """
+    r, g, b = colorsys.hsv_to_rgb((cell_type * 0.618033988749895) % 1, 0.75, 0.95)
+    return int(r * 255), int(g * 255), int(b * 255)
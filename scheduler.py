@@ -0,0 +1,39 @@
+# scheduler.py
+
+
+class FixedTimestep:
+    def __init__(self, rate, max_steps=None):
+        """
+        Turn elapsed wall-clock time into a whole number of fixed-size steps.
+
+        Time that does not add up to a full step is carried over to the next
+        call, so the long-run step rate matches `rate` whatever the frame rate.
+
+        Parameters:
+            rate (float): Steps per second.
+            max_steps (int): Most steps handed out per call. Any backlog beyond it
+                             is dropped, so a slow frame cannot snowball.
+        """
+        self.rate = rate
+        self.dt = 1 / rate
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+
+    def advance(self, elapsed):
+        """
+        Add `elapsed` seconds and return how many steps are now due.
+        """
+        self.accumulator += elapsed
+        steps = int(self.accumulator * self.rate)
+        if self.max_steps is not None and steps > self.max_steps:
+            steps = self.max_steps
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= steps * self.dt
+        return steps
+
+    def reset(self):
+        """
+        Forget any time carried over, e.g. while paused.
+        """
+        self.accumulator = 0.0
@@ -0,0 +1,259 @@
+# simulation_worker.py
+
+import collections
+import threading
+
+import numpy as np
+
+
+class Snapshot:
+    __slots__ = ("grid", "generation", "populations", "cycle")
+
+    def __init__(self, grid, populations):
+        """
+        One published generation: a private copy of the grid and its statistics.
+        """
+        self.grid = grid
+        self.generation = 0
+        self.populations = populations
+        self.cycle = None
+
+
+class SimulationWorker:
+    def __init__(self, game, profiler=None):
+        """
+        A background thread that owns a CompetitiveGameOfLife and does all its stepping.
+
+        Completed generations are published through three snapshot buffers: the
+        worker fills the back one and swaps it with the middle one, the reader
+        swaps the middle one into the front whenever a newer one is there. Each
+        side only ever touches its own buffer, and the shared lock is only held
+        for those swaps, so drawing never waits for a step to finish and never
+        sees a half-stepped grid.
+
+        Edits are queued and applied by the worker between steps. The worker also
+        stands in for the board where the game only reads cells and makes edits
+        (`grid`, `place_cell`, `remove_cell`, the bulk edits, `reset_grid`,
+        drawing).
+
+        Parameters:
+            game (CompetitiveGameOfLife): The board. Only the worker may touch it
+                                          once started; use `call` for anything else.
+            profiler (Profiler): Steps are timed as its "board" phase, if given.
+        """
+        self.game = game
+        self.profiler = profiler
+        self.colors = game.colors
+
+        def snapshot():
+            return Snapshot(np.zeros_like(game.grid), np.zeros_like(game.populations))
+
+        self._slots = [snapshot(), snapshot(), snapshot()]
+        self._front, self._middle, self._back = 0, 1, 2
+        self._fresh = False
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._jobs = collections.deque()
+        self._pending = 0
+        self._busy = False
+        self._stop = False
+        self._error = None
+
+        self._published_dirty = game.pop_dirty_tiles()  # Starts change tracking; all tiles at first
+        self._unseen_dirty = np.zeros_like(self._published_dirty)
+        self._publish()
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._wake:
+                while not (self._stop or self._jobs or self._pending):
+                    self._wake.wait()
+                if self._stop:
+                    return
+                generations, self._pending = self._pending, 0
+                jobs = list(self._jobs)
+                self._jobs.clear()
+                self._busy = True
+            try:
+                for job in jobs:
+                    job()
+                if generations:
+                    if self.profiler is None:
+                        self.game.advance(generations)
+                    else:
+                        with self.profiler.phase("board"):
+                            self.game.advance(generations)
+                if generations or self.game.has_dirty_tiles:  # Edits that changed nothing publish nothing
+                    self._publish()
+            except Exception as error:  # Reported to the game loop on its next call
+                self._error = error
+                return
+            finally:
+                with self._lock:
+                    self._busy = False
+
+    def _publish(self):
+        """
+        Copy the board into the back snapshot and make it the newest one.
+        """
+        game = self.game
+        back = self._slots[self._back]
+        np.copyto(back.grid, game.grid)
+        back.generation = game.generation
+        np.copyto(back.populations, game.populations)
+        back.cycle = game.cycle
+        dirty = game.pop_dirty_tiles()
+        with self._lock:
+            self._back, self._middle = self._middle, self._back
+            self._fresh = True
+            self._published_dirty |= dirty
+
+    def _check(self):
+        if self._error is not None:
+            raise self._error
+
+    def latest(self):
+        """
+        Return the newest published Snapshot, without waiting for the worker.
+
+        The snapshot stays valid and unchanged until the next call.
+        """
+        self._check()
+        with self._lock:
+            if self._fresh:
+                self._front, self._middle = self._middle, self._front
+                self._fresh = False
+                self._unseen_dirty |= self._published_dirty
+                self._published_dirty[:] = False
+        return self._slots[self._front]
+
+    @property
+    def grid(self):
+        """
+        The newest published grid. Read-only: edits go through the worker.
+        """
+        return self.latest().grid
+
+    def request(self, generations):
+        """
+        Ask for `generations` more generations.
+
+        Generations asked for while the worker is still busy with earlier ones
+        are dropped: the simulation slows down rather than the frame rate.
+        """
+        self._check()
+        if generations <= 0:
+            return
+        with self._wake:
+            if not self._busy and not self._pending:
+                self._pending = generations
+                self._wake.notify()
+
+    def submit(self, fn, *args):
+        """
+        Queue `fn(*args)` to run on the worker before its next step.
+        """
+        self._check()
+        with self._wake:
+            self._jobs.append(lambda: fn(*args))
+            self._wake.notify()
+
+    def place_cell(self, x, y, cell_type):
+        self.submit(self.game.place_cell, x, y, cell_type)
+
+    def remove_cell(self, x, y):
+        self.submit(self.game.remove_cell, x, y)
+
+    def place_cells(self, xs, ys, cell_type):
+        self.submit(self.game.place_cells, xs, ys, cell_type)
+
+    def clear_cells(self, xs, ys):
+        self.submit(self.game.clear_cells, xs, ys)
+
+    def stamp(self, pattern, x, y, transparent=False):
+        self.submit(self.game.stamp, pattern, x, y, transparent)
+
+    def fill_rect(self, x, y, width, height, cell_type):
+        self.submit(self.game.fill_rect, x, y, width, height, cell_type)
+
+    def fill_circle(self, cx, cy, radius, cell_type):
+        self.submit(self.game.fill_circle, cx, cy, radius, cell_type)
+
+    def reset_grid(self):
+        self.submit(self.game.reset_grid)
+
+    def call(self, fn, *args):
+        """
+        Run `fn(*args)` on the worker between two steps, wait for it and return its result.
+
+        For anything that needs the whole board at a generation boundary, such as
+        saving. Its effect on the board is published before this returns.
+        """
+        done = threading.Event()
+        result = {}
+
+        def job():
+            try:
+                result["value"] = fn(*args)
+                self._publish()
+            except Exception as error:
+                result["error"] = error
+            done.set()
+
+        self.submit(job)
+        while not done.wait(0.1):
+            self._check()
+            if not self._thread.is_alive():
+                raise RuntimeError("The simulation worker has stopped")
+        if "error" in result:
+            raise result["error"]
+        return result.get("value")
+
+    def pop_dirty_tiles(self):
+        """
+        Return the mask of TILE_SIZE tiles changed between the snapshots seen so far, and clear it.
+        """
+        self.latest()
+        return self._take_dirty()
+
+    def _take_dirty(self):
+        dirty = self._unseen_dirty.copy()
+        self._unseen_dirty[:] = False
+        return dirty
+
+    def draw_grid(self, screen, cell_size=10, paused=False):
+        """
+        Draw the newest snapshot, see CompetitiveGameOfLife.draw_grid.
+
+        Everything on screen is then up to date, so the dirty tiles of that same
+        snapshot are cleared too; the next draw_dirty only repaints later changes.
+        """
+        grid = self.grid
+        self.game._get_renderer().draw(screen, grid, cell_size, paused)  # Only ever used on this thread
+        self._take_dirty()
+
+    def draw_dirty(self, screen, cell_size=10, paused=False):
+        """
+        Redraw the tiles changed since the last call, see CompetitiveGameOfLife.draw_dirty.
+        """
+        grid = self.grid  # Take the snapshot once, so grid and dirty tiles belong together
+        return self.game._get_renderer().draw_tiles(screen, grid, self._take_dirty(), cell_size, paused)
+
+    def close(self):
+        """
+        Stop the worker after its current step and wait for it.
+        """
+        with self._wake:
+            self._stop = True
+            self._wake.notify()
+        self._thread.join()
+        self._check()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
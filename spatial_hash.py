@@ -0,0 +1,122 @@
+# spatial_hash.py
+
+import numpy as np
+
+
+class SpatialHash:
+    def __init__(self, cell_size, box=None):
+        """
+        Uniform-grid spatial hash for fixed-radius neighbour queries.
+
+        Points are bucketed into square cells of side `cell_size` and sorted by
+        cell, so a query only looks at the 3x3 block of cells around each query
+        point. Queries with radius <= cell_size are exact.
+
+        Parameters:
+            cell_size (float): Side of a cell, at least the largest query radius.
+            box (tuple): (width, height) of a toroidal domain; None for an unbounded plane.
+        """
+        self.cell_size = cell_size
+        self.box = None if box is None else np.asarray(box, dtype=float)
+        self.points = None
+
+    def _cells(self, P):
+        """
+        Return the integer (cx, cy) cell of each point.
+        """
+        if self.box is None:
+            return np.floor(P / self.cell_size).astype(np.int64)
+        return (np.floor((P % self.box) / self._cell_extent).astype(np.int64)) % self._shape
+
+    def build(self, X):
+        """
+        Bucket the points X, shape (N, 2).
+        """
+        self.points = np.asarray(X, dtype=float)
+        if self.box is not None:
+            # Whole number of cells across the torus, each at least cell_size wide.
+            self._shape = np.maximum((self.box // self.cell_size).astype(np.int64), 1)
+            self._cell_extent = self.box / self._shape
+        cells = self._cells(self.points)
+        if self.box is None:
+            self._origin = cells.min(axis=0) - 1 if len(cells) else np.zeros(2, dtype=np.int64)
+            # One spare cell on each side so neighbouring keys never alias.
+            self._shape = (cells.max(axis=0) - self._origin + 2) if len(cells) else np.ones(2, dtype=np.int64)
+            cells = cells - self._origin
+        keys = cells[:, 0] * self._shape[1] + cells[:, 1]
+        self._order = np.argsort(keys, kind="stable")
+        self._keys = keys[self._order]
+        return self
+
+    def _offsets(self):
+        """
+        Return the distinct cell offsets of the 3x3 neighbourhood.
+        """
+        if self.box is None:
+            return [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)]
+        # On a torus only one or two cells wide, -1 and +1 name the same cell.
+        xs = sorted({d % self._shape[0] for d in (-1, 0, 1)})
+        ys = sorted({d % self._shape[1] for d in (-1, 0, 1)})
+        return [(dx, dy) for dx in xs for dy in ys]
+
+    def query(self, P, radius=None):
+        """
+        Find every (query point, hashed point) pair closer than `radius`.
+
+        Parameters:
+            P (ndarray): Query points, shape (M, 2).
+            radius (float): Search radius, cell_size if None.
+
+        Returns:
+            tuple: (i, j, r) with i indexing P, j indexing the hashed points and
+                   r = P[i] - X[j] (the shortest displacement on a torus).
+        """
+        radius = self.cell_size if radius is None else radius
+        P = np.asarray(P, dtype=float)
+        empty = (np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp), np.zeros((0, 2)))
+        if len(P) == 0 or len(self._keys) == 0:
+            return empty
+
+        cells = self._cells(P)
+        if self.box is None:
+            cells = cells - self._origin
+            # Query points outside the hashed extent cannot have neighbours there.
+            inside = np.all((cells >= 0) & (cells < self._shape), axis=1)
+        rows, cols = [], []
+        for dx, dy in self._offsets():
+            cx, cy = cells[:, 0] + dx, cells[:, 1] + dy
+            if self.box is not None:
+                cx, cy = cx % self._shape[0], cy % self._shape[1]
+            keys = cx * self._shape[1] + cy
+            start = np.searchsorted(self._keys, keys, side="left")
+            counts = np.searchsorted(self._keys, keys, side="right") - start
+            if self.box is None:
+                counts[~inside] = 0
+            total = counts.sum()
+            if total == 0:
+                continue
+            # Expand each query point's [start, start+count) range into flat indices.
+            first = np.repeat(start - np.cumsum(counts) + counts, counts)
+            rows.append(np.repeat(np.arange(len(P)), counts))
+            cols.append(self._order[first + np.arange(total)])
+        if not rows:
+            return empty
+
+        i = np.concatenate(rows)
+        j = np.concatenate(cols)
+        r = P[i] - self.points[j]
+        if self.box is not None:
+            r -= self.box * np.round(r / self.box)
+        keep = np.einsum("ij,ij->i", r, r) < radius * radius
+        return i[keep], j[keep], r[keep]
+
+    def pairs(self, radius=None):
+        """
+        Find every ordered pair of distinct hashed points closer than `radius`.
+
+        Returns:
+            tuple: (i, j, r) as for `query`, with i != j.
+        """
+        i, j, r = self.query(self.points, radius)
+        keep = i != j
+        return i[keep], j[keep], r[keep]
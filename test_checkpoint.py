@@ -0,0 +1,93 @@
+# test_checkpoint.py
+
+import numpy as np
+import pytest
+
+import checkpoint
+from game_logic import CompetitiveGameOfLife
+from headless import seed_board
+
+
+def soup_board(**kwargs):
+    game = CompetitiveGameOfLife(70, 50, engine="numpy", seed=5, **kwargs)
+    seed_board(game, "soup", 0.4)
+    game.advance(3)
+    return game
+
+
+@pytest.mark.parametrize("encoding", checkpoint.ENCODINGS)
+@pytest.mark.parametrize("dtype, top", [(np.uint8, 4), (np.uint16, 300)])
+def test_encode_round_trip(encoding, dtype, top):
+    grid = np.random.default_rng(0).integers(0, top + 1, (37, 29)).astype(dtype)
+    payload, params = checkpoint.encode_grid(grid, encoding)
+    decoded = checkpoint.decode_grid(bytes(payload), encoding, grid.shape, grid.dtype, params)
+    assert decoded.dtype == grid.dtype
+    np.testing.assert_array_equal(decoded, grid)
+
+
+@pytest.mark.parametrize("encoding", checkpoint.ENCODINGS)
+def test_save_load_round_trip(tmp_path, encoding):
+    game = soup_board()
+    extra = {"player": {"position": np.array([1.5, 2.5]), "lives": 3}, "note": "x"}
+    path = tmp_path / "run.gol"
+    checkpoint.save(path, game, encoding, extra)
+
+    loaded, ckpt = checkpoint.load(path)
+    np.testing.assert_array_equal(loaded.grid, game.grid)
+    assert loaded.generation == game.generation == 3
+    assert (loaded.seed, loaded.engine, loaded.tie_break) == (game.seed, game.engine, game.tie_break)
+    assert loaded.rng.bit_generator.state == game.rng.bit_generator.state
+    np.testing.assert_array_equal(loaded.populations, game.populations)
+    np.testing.assert_array_equal(ckpt.extra["player"]["position"], [1.5, 2.5])
+    assert ckpt.extra["player"]["lives"] == 3 and ckpt.extra["note"] == "x"
+
+
+@pytest.mark.parametrize("encoding", checkpoint.ENCODINGS)
+def test_resume_matches_uninterrupted_run(tmp_path, encoding):
+    game = soup_board(tie_break="random")
+    checkpoint.save(tmp_path / "run.gol", game, encoding)
+    resumed, _ = checkpoint.load(tmp_path / "run.gol")
+    game.advance(10)
+    resumed.advance(10)
+    np.testing.assert_array_equal(resumed.grid, game.grid)
+
+
+def test_memmap_resume_leaves_file_alone(tmp_path):
+    game = soup_board(tie_break="random")
+    path = tmp_path / "run.gol"
+    checkpoint.save(path, game, "raw")
+    saved = path.read_bytes()
+
+    resumed, ckpt = checkpoint.load(path, mmap=True)
+    assert isinstance(ckpt.grid, np.memmap)
+    resumed.place_cell(0, 0, 1)
+    resumed.advance(10)
+    game.place_cell(0, 0, 1)
+    game.advance(10)
+    np.testing.assert_array_equal(resumed.grid, game.grid)
+    assert path.read_bytes() == saved  # Mapped copy-on-write
+
+    # Only raw grids can be mapped; the others are decoded as usual
+    checkpoint.save(path, game, "rle")
+    assert not isinstance(checkpoint.Checkpoint.read(path, mmap=True).grid, np.memmap)
+
+
+def test_restore_into_existing_board(tmp_path):
+    game = soup_board()
+    checkpoint.save(tmp_path / "run.gol", game)
+    other = CompetitiveGameOfLife(70, 50, engine="numpy", seed=1)
+    checkpoint.restore(other, checkpoint.Checkpoint.read(tmp_path / "run.gol"))
+    np.testing.assert_array_equal(other.grid, game.grid)
+    assert other.generation == game.generation
+
+    with pytest.raises(ValueError):
+        checkpoint.restore(CompetitiveGameOfLife(10, 10), checkpoint.Checkpoint.read(tmp_path / "run.gol"))
+
+
+def test_rejects_bad_files(tmp_path):
+    path = tmp_path / "run.gol"
+    path.write_bytes(b"not a checkpoint")
+    with pytest.raises(ValueError):
+        checkpoint.load(path)
+    with pytest.raises(ValueError):
+        checkpoint.save(path, soup_board(), "zip")
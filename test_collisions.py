@@ -0,0 +1,63 @@
+# test_collisions.py
+
+import numpy as np
+import pygame
+
+from collisions import CollisionSystem
+from flock_engine import FlockEngine
+from game_logic import CompetitiveGameOfLife
+from Projectile import ProjectilePool
+
+SCREEN = (200, 100)
+
+
+def make_scene():
+    """
+    Two one-boid teams and an empty 20x10 board of 10 px cells, filling the screen.
+    """
+    screen = pygame.Surface(SCREEN)
+    flocks = FlockEngine(screen, seed=0)
+    for _ in range(2):
+        flocks.add_team((0, 0), N=1)
+    flocks.X[:] = [[50.0, 50.0], [150.0, 50.0]]
+    pool = ProjectilePool(screen)
+    game = CompetitiveGameOfLife(20, 10, seed=0)
+    return CollisionSystem(SCREEN), pool, flocks, game
+
+
+def test_projectiles_only_hit_other_teams():
+    system, pool, flocks, _ = make_scene()
+    # Centred on boid 0 for team 0 and team 1, on boid 1 across the wrap, and far from both
+    pool.spawn(np.array([[51.5, 51.5], [51.5, 51.5], [151.5 - 200, 51.5], [100.0, 10.0]]), np.ones((4, 2)),
+               team_idx=[0, 1, 0, 1])
+    hit_p, hit_b = system.projectile_boid_hits(pool, flocks.X, flocks.team)
+    assert hit_p.tolist() == [1, 2]
+    assert hit_b.tolist() == [0, 1]
+
+
+def test_projectiles_hit_live_cells():
+    system, pool, _, game = make_scene()
+    game.place_cell(3, 4, 2)
+    pool.spawn(np.array([[35.0, 45.0], [215.0, 45.0], [55.0, 45.0]]), np.ones((3, 2)))
+    hit_p, xs, ys = system.projectile_cell_hits(pool, game.grid, 10)
+    assert hit_p.tolist() == [0]
+    assert (xs.tolist(), ys.tolist()) == ([3], [4])
+
+
+def test_resolve_clears_cells_and_removes_projectiles():
+    system, pool, flocks, game = make_scene()
+    game.place_cell(3, 4, 2)
+    pool.spawn(np.array([[51.5, 51.5], [35.0, 45.0], [100.0, 10.0]]), np.ones((3, 2)), team_idx=[1, 0, 0])
+    hits = system.resolve(pool, flocks, game, 10)
+    assert hits.tolist() == [1, 0]
+    assert game.grid[4, 3] == 0 and game.populations[2] == 0
+    assert len(pool) == 1
+    np.testing.assert_array_equal(pool.positions[0], [100.0, 10.0])
+
+
+def test_hidden_boids_are_not_hit():
+    system, pool, flocks, game = make_scene()
+    pool.spawn(np.array([[51.5, 51.5]]), np.ones((1, 2)), team_idx=1)
+    hits = system.resolve(pool, flocks, game, 10, boids=False)
+    assert hits.tolist() == [0, 0]
+    assert len(pool) == 1
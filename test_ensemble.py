@@ -0,0 +1,76 @@
+# test_ensemble.py
+
+import numpy as np
+import pytest
+
+import ensemble
+from game_logic import CompetitiveGameOfLife
+from headless import seed_board
+from rules import RuleSet, standard_rules
+
+
+def single_run(seed, width, height, generations, density, rules=None):
+    """
+    Step one board with this seed and track when it, and each live type, died out.
+    """
+    rules = rules if rules is not None else standard_rules()
+    game = CompetitiveGameOfLife(width, height, list(range(rules.num_types)), engine="numpy", seed=seed,
+                                 rules=rules)
+    seed_board(game, "random", density)
+    extinction = -1
+    type_extinction = np.where(game.populations[1:] == 0, 0, -1)
+    for _ in range(generations):
+        game.update_grid(False)
+        gone = (game.populations[1:] == 0) & (type_extinction < 0)
+        type_extinction[gone] = game.generation
+        if extinction < 0 and game.populations[0] == game.grid.size:
+            extinction = game.generation
+    return game, extinction, type_extinction
+
+
+def test_random_boards_match_seed_board():
+    grids = ensemble.random_boards([3, 8], 30, 20, 5, density=0.3)
+    for grid, seed in zip(grids, [3, 8]):
+        game = CompetitiveGameOfLife(30, 20, seed=seed)
+        seed_board(game, "random", 0.3)
+        np.testing.assert_array_equal(grid, game.grid)
+
+
+@pytest.mark.parametrize("processes, batch_size", [(1, 64), (2, 5)])
+def test_run_matches_single_boards(processes, batch_size):
+    seeds = list(range(40, 52))
+    result = ensemble.run(seeds, width=24, height=20, generations=60, density=0.35,
+                          processes=processes, batch_size=batch_size)
+    np.testing.assert_array_equal(result["seeds"], seeds)
+    for k, seed in enumerate(seeds):
+        game, extinction, type_extinction = single_run(seed, 24, 20, 60, 0.35)
+        np.testing.assert_array_equal(result["populations"][k], game.populations)
+        assert result["extinction"][k] == extinction
+        np.testing.assert_array_equal(result["type_extinction"][k], type_extinction)
+
+
+def test_extinct_boards_leave_the_stack():
+    """
+    Sparse boards die out early; dropping them must not disturb the survivors.
+    """
+    rules = RuleSet(4, birth=3, survival=(2, 3))
+    seeds = range(30)
+    boards = ensemble.Ensemble(ensemble.random_boards(seeds, 16, 16, 4, 0.08), seeds, rules)
+    boards.advance(40)
+    assert 0 < boards.alive < len(seeds)
+    final = boards.boards()
+    for seed in seeds:
+        game, extinction, _ = single_run(seed, 16, 16, 40, 0.08, rules)
+        np.testing.assert_array_equal(final[seed], game.grid)
+        assert boards.extinction[seed] == extinction
+    assert boards.generation == 40
+
+
+def test_summarize_and_bad_input():
+    summary = ensemble.summarize(ensemble.run(range(3), 16, 16, 10, processes=1))
+    assert summary["runs"] == 3 and summary["generations"] == 10
+    assert len(summary["mean_population"]) == 5
+    with pytest.raises(ValueError):
+        ensemble.Ensemble(np.zeros((2, 4, 4), dtype=np.uint8), [1])
+    with pytest.raises(ValueError):
+        ensemble.run([])
@@ -0,0 +1,214 @@
+# test_game_logic.py
+
+import numpy as np
+import pytest
+
+from game_logic import TILE_SIZE, CompetitiveGameOfLife, zobrist_hash
+from headless import seed_board
+
+
+def expected_stats(game):
+    """
+    Populations, bounds and hash recomputed from scratch, to compare with the incremental ones.
+    """
+    num_types = len(game.cell_types)
+    populations = np.bincount(game.grid.ravel(), minlength=num_types)
+    bounds = []
+    for cell_type in range(1, num_types):
+        ys, xs = np.nonzero(game.grid == cell_type)
+        bounds.append((xs.min(), ys.min(), xs.max() + 1, ys.max() + 1) if len(xs) else None)
+    index = np.flatnonzero(game.grid)
+    return populations, bounds, zobrist_hash(index, game.grid.ravel()[index], num_types)
+
+
+def assert_stats(game):
+    populations, bounds, state_hash = expected_stats(game)
+    np.testing.assert_array_equal(game.populations, populations)
+    assert [game.bounds(t) for t in range(1, len(game.cell_types))] == bounds
+    assert game.state_hash == state_hash
+
+
+def tracked_board(engine="numpy", **kwargs):
+    game = CompetitiveGameOfLife(70, 50, engine=engine, seed=3, track_bounds=True, cycle_window=20, **kwargs)
+    seed_board(game, "soup", 0.4)
+    return game
+
+
+@pytest.mark.parametrize("engine", ["loop", "numpy", "sparse"])
+def test_stats_follow_steps_and_edits(engine):
+    game = tracked_board(engine)
+    assert_stats(game)
+    for _ in range(4):
+        game.update_grid(False)
+        assert_stats(game)
+    game.place_cell(0, 0, 2)
+    game.place_cell(69, 49, 4)
+    game.remove_cell(35, 25)
+    game.place_cell(-1, 3, 1)  # Off the board: ignored
+    assert_stats(game)
+    game.update_grid(False)
+    assert_stats(game)
+
+
+def test_apply_life_rules_keeps_stats():
+    game = CompetitiveGameOfLife(16, 16, seed=1, track_bounds=True, cycle_window=10)
+    game.place_cell(3, 3, 2)
+    game.apply_life_rules(3, 3)  # A lone cell dies
+    assert game.grid[3, 3] == 0
+    assert_stats(game)
+
+
+def test_invalid_type_leaves_stats_untouched():
+    game = tracked_board()
+    before = game.populations.copy(), game.state_hash, game.grid.copy()
+    with pytest.raises(ValueError):
+        game.place_cell(0, 0, 9)
+    with pytest.raises(ValueError):
+        game.place_cell(0, 0, -1)
+    np.testing.assert_array_equal(game.populations, before[0])
+    assert game.state_hash == before[1]
+    np.testing.assert_array_equal(game.grid, before[2])
+    assert_stats(game)
+
+
+def test_edits_mark_dirty_tiles():
+    game = CompetitiveGameOfLife(70, 50, seed=1)
+    assert game.pop_dirty_tiles().all()  # Tracking starts with every tile dirty
+    game.place_cell(40, 10, 1)
+    dirty = game.pop_dirty_tiles()
+    assert dirty[10 // TILE_SIZE, 40 // TILE_SIZE] and dirty.sum() == 1
+    assert not game.pop_dirty_tiles().any()
+
+
+def test_recount_after_direct_assignment():
+    game = tracked_board()
+    game.grid[:] = np.random.default_rng(0).integers(0, 5, game.grid.shape)
+    game.recount()
+    assert_stats(game)
+
+
+def test_cycle_found_and_skipped():
+    game = CompetitiveGameOfLife(96, 96, engine="numpy", seed=9, cycle_window=200)
+    seed_board(game, "random", 0.1)
+    game.advance(50)
+    assert game.cycle == (4, 2)
+    game.advance(10 ** 8)  # Replayed from the stored period, not stepped
+    assert game.generation == 50 + 10 ** 8
+
+    plain = CompetitiveGameOfLife(96, 96, engine="numpy", seed=9)
+    seed_board(plain, "random", 0.1)
+    plain.advance(4 + (game.generation - 4) % 2)
+    np.testing.assert_array_equal(game.grid, plain.grid)
+    np.testing.assert_array_equal(game.populations, plain.populations)
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_cycle_jumps_match_plain_stepping(seed):
+    game = CompetitiveGameOfLife(24, 24, engine="numpy", seed=seed, cycle_window=64)
+    plain = CompetitiveGameOfLife(24, 24, engine="sparse", seed=seed)
+    for board in (game, plain):
+        seed_board(board, "soup", 0.5)
+    for generations in (300, 7, 1000, 1):
+        game.advance(generations)
+        plain.advance(generations)
+        np.testing.assert_array_equal(game.grid, plain.grid)
+        np.testing.assert_array_equal(game.populations, plain.populations)
+
+
+def test_edit_forgets_cycle():
+    game = CompetitiveGameOfLife(96, 96, engine="numpy", seed=9, cycle_window=200)
+    seed_board(game, "random", 0.1)
+    game.advance(20)
+    assert game.cycle is not None
+    game.place_cell(50, 50, 1)
+    assert game.cycle is None
+    assert game.state_hash == expected_stats(game)[2]
+
+
+def twin_boards():
+    """
+    Two equal tracked boards with their initial dirty tiles popped, one for bulk and one for per-cell edits.
+    """
+    boards = tracked_board(), tracked_board()
+    for game in boards:
+        game.pop_dirty_tiles()
+    return boards
+
+
+def assert_same_board(bulk, single):
+    np.testing.assert_array_equal(bulk.grid, single.grid)
+    np.testing.assert_array_equal(bulk.pop_dirty_tiles(), single.pop_dirty_tiles())
+    assert_stats(bulk)
+    assert bulk.state_hash == single.state_hash
+
+
+def test_place_cells_matches_place_cell():
+    bulk, single = twin_boards()
+    xs = [0, 69, 5, -1, 70, 5, 33]
+    ys = [0, 49, 5, 3, 3, 5, 12]
+    types = [1, 2, 3, 4, 4, 4, 2]  # Two off the board; (5, 5) twice, the last wins
+    bulk.place_cells(xs, ys, types)
+    for x, y, cell_type in zip(xs, ys, types):
+        single.place_cell(x, y, cell_type)
+    assert bulk.grid[5, 5] == 4
+    assert_same_board(bulk, single)
+
+    bulk.clear_cells(xs, ys)
+    for x, y in zip(xs, ys):
+        single.remove_cell(x, y)
+    assert_same_board(bulk, single)
+
+
+def test_stamp_wraps_around():
+    bulk, single = twin_boards()
+    pattern = np.array([[1, 0, 2], [0, 3, 4]])
+    bulk.stamp(pattern, 68, 49)
+    for (dy, dx), cell_type in np.ndenumerate(pattern):
+        single.place_cell((68 + dx) % 70, (49 + dy) % 50, int(cell_type))
+    assert_same_board(bulk, single)
+
+
+def test_transparent_stamp_keeps_board():
+    game = tracked_board()
+    before = game.grid.copy()
+    pattern = np.array([[2, 0], [0, 2]])
+    game.stamp(pattern, -1, 10, transparent=True)
+    expected = before.copy()
+    expected[10, 69] = expected[11, 0] = 2
+    np.testing.assert_array_equal(game.grid, expected)
+    assert_stats(game)
+
+
+def test_fill_shapes():
+    game = CompetitiveGameOfLife(40, 30, seed=1, track_bounds=True, cycle_window=10)
+    game.fill_rect(35, 28, 10, 4, 3)  # Wraps across both edges
+    assert game.populations[3] == 40
+    assert game.grid[28:, 35:].all() and game.grid[:2, :5].all()
+    game.fill_circle(20, 15, 2, 1)
+    assert game.populations[1] == 13
+    assert game.grid[15, 18] == game.grid[13, 20] == 1 and game.grid[13, 18] == 0
+    assert_stats(game)
+    with pytest.raises(ValueError):
+        game.fill_rect(0, 0, 41, 1, 1)  # Wider than the board
+
+
+def test_bulk_edit_rejects_invalid_types():
+    game = tracked_board()
+    before = game.grid.copy()
+    with pytest.raises(ValueError):
+        game.place_cells([1, 2], [1, 2], [1, 5])
+    with pytest.raises(ValueError):
+        game.stamp([[1, -1]], 0, 0)
+    np.testing.assert_array_equal(game.grid, before)
+    assert_stats(game)
+
+
+def test_load_rle(tmp_path):
+    path = tmp_path / "glider.rle"
+    path.write_text("#N Glider\nx = 3, y = 3\nbo$2bo$3o!\n")
+    game = CompetitiveGameOfLife(20, 20, seed=1)
+    pattern = game.load_rle(path, cell_type=2)
+    np.testing.assert_array_equal(game.grid[8:11, 8:11], pattern)  # Centred
+    assert game.populations[2] == 5
+    game.load_rle(path, x=-1, y=0)
+    assert game.grid[0, 0] == 1 and game.grid[2, 19] == 1
@@ -0,0 +1,65 @@
+# test_integrators.py
+
+import numpy as np
+import pytest
+
+from integrators import INTEGRATORS, get_integrator
+
+ORDERS = {"euler": 1, "semi_implicit": 1, "verlet": 2, "rk4": 4}
+
+
+def oscillator_error(name, steps, damping=0.0):
+    """
+    Position error after integrating a damped harmonic oscillator to t = 1 in `steps` steps.
+    """
+    integrator = get_integrator(name)
+    x = np.array([[1.0, 0.0]])
+    v = np.array([[0.0, 1.0]])
+    for _ in range(steps):
+        integrator.step_inplace(x, v, lambda x, v: -x - damping * v, 1.0 / steps)
+    # x'' = -x - c x' with x(0) = (1, 0), x'(0) = (0, 1).
+    w = np.sqrt(1 - damping ** 2 / 4)
+    decay = np.exp(-damping / 2)
+    exact = decay * np.array([np.cos(w) + damping / (2 * w) * np.sin(w), np.sin(w) / w])
+    return np.abs(x[0] - exact).max()
+
+
+def test_orders_cover_every_integrator():
+    assert set(ORDERS) == set(INTEGRATORS)
+
+
+@pytest.mark.parametrize("damping", [0.0, 0.5])
+@pytest.mark.parametrize("name", sorted(ORDERS))
+def test_convergence_order(name, damping):
+    """
+    Halving the step divides the error by about 2**order, velocity-dependent forces included.
+    """
+    coarse, fine = oscillator_error(name, 20, damping), oscillator_error(name, 40, damping)
+    order = np.log2(coarse / fine)
+    assert order == pytest.approx(ORDERS[name], abs=0.3)
+
+
+def test_higher_order_is_more_accurate():
+    errors = [oscillator_error(name, 50) for name in ("euler", "verlet", "rk4")]
+    assert errors == sorted(errors, reverse=True)
+    assert errors[-1] < 1e-8
+
+
+def spring(x, v):
+    return -x
+
+
+def test_substeps_match_smaller_steps():
+    x1, v1 = np.ones((4, 2)), np.zeros((4, 2))
+    x2, v2 = x1.copy(), v1.copy()
+    get_integrator("rk4").step_inplace(x1, v1, spring, 0.2, substeps=4)
+    integrator = get_integrator("rk4")
+    for _ in range(4):
+        integrator.step_inplace(x2, v2, spring, 0.05)
+    np.testing.assert_allclose(x1, x2)
+    np.testing.assert_allclose(v1, v2)
+
+
+def test_unknown_integrator():
+    with pytest.raises(ValueError):
+        get_integrator("leapfrog")
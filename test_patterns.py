@@ -0,0 +1,43 @@
+# test_patterns.py
+
+import numpy as np
+import pytest
+
+from patterns import parse_rle, read_rle
+
+
+def test_two_state_pattern():
+    text = """#N Glider
+#C A comment
+x = 3, y = 3, rule = B3/S23
+bo$2bo$3o!
+"""
+    np.testing.assert_array_equal(parse_rle(text), [[0, 1, 0], [0, 0, 1], [1, 1, 1]])
+
+
+def test_header_size_pads_rows():
+    cells = parse_rle("x = 5, y = 4\no2$\n3o!")
+    assert cells.shape == (4, 5)
+    np.testing.assert_array_equal(cells[:, :3], [[1, 0, 0], [0, 0, 0], [1, 1, 1], [0, 0, 0]])
+
+
+def test_everything_after_the_end_is_ignored():
+    np.testing.assert_array_equal(parse_rle("2o!\nthis is not RLE"), [[1, 1]])
+
+
+def test_multi_state_pattern():
+    cells = parse_rle("x = 6, y = 2, rule = Generations\n.A2X$pAyO.qB!")
+    np.testing.assert_array_equal(cells, [[0, 1, 24, 24, 0, 0], [25, 255, 0, 50, 0, 0]])
+    assert cells.dtype == np.uint8
+
+
+@pytest.mark.parametrize("text", ["yP!", "yX!", "3z!", "2o3!", "o$p!"])
+def test_rejects_bad_tokens(text):
+    with pytest.raises(ValueError):
+        parse_rle(text)
+
+
+def test_read_rle(tmp_path):
+    path = tmp_path / "block.rle"
+    path.write_text("x = 2, y = 2\n2o$2o!\n")
+    np.testing.assert_array_equal(read_rle(path), np.ones((2, 2)))
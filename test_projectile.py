@@ -0,0 +1,61 @@
+# test_projectile.py
+
+import numpy as np
+import pygame
+import pytest
+
+from Projectile import ProjectilePool
+
+
+def make_pool(**kwargs):
+    return ProjectilePool(pygame.Surface((200, 100)), **kwargs)
+
+
+def test_spawn_normalizes_and_caps_capacity():
+    pool = make_pool(capacity=3)
+    assert pool.spawn(np.zeros((2, 2)), np.array([[3.0, 4.0], [0.0, 0.0]]), team_idx=[1, 2]) == 2
+    np.testing.assert_allclose(pool.directions[:2], [[0.6, 0.8], [0.0, 0.0]])
+    assert pool.team_idx[:2].tolist() == [1, 2]
+    assert pool.spawn(np.zeros((2, 2)), np.ones((2, 2))) == 1  # Only one slot left
+    assert len(pool) == 3
+
+
+def test_kill_keeps_survivors_packed_in_order():
+    pool = make_pool()
+    pool.spawn(np.arange(10.0).reshape(5, 2), np.ones((5, 2)), team_idx=np.arange(5))
+    pool.kill(np.array([0, 3]))
+    assert len(pool) == 3
+    assert pool.team_idx[:3].tolist() == [1, 2, 4]
+    np.testing.assert_array_equal(pool.positions[:3, 0], [2.0, 4.0, 8.0])
+
+
+@pytest.mark.parametrize("rate", [30, 60, 120])
+def test_range_does_not_depend_on_update_rate(rate):
+    pool = make_pool(velocity=1000, life_time=0.2)
+    pool.spawn(np.zeros(2), np.array([1.0, 0.0]))
+    last = 0.0
+    while len(pool):
+        last = pool.positions[0, 0]
+        pool.update(1 / rate)
+    assert last == pytest.approx(200, abs=1000 / rate)
+
+
+def test_state_round_trip():
+    pool = make_pool()
+    pool.spawn(np.random.default_rng(0).random((4, 2)), np.ones((4, 2)), team_idx=[0, 1, 0, 1])
+    pool.update(0.05)
+    other = make_pool()
+    other.set_state(pool.get_state())
+    assert len(other) == 4
+    for name in ("positions", "directions", "lives", "team_idx"):
+        np.testing.assert_array_equal(getattr(other, name)[:4], getattr(pool, name)[:4])
+
+
+def test_draw_paints_squares_with_wraparound():
+    pool = make_pool(size=3)
+    pool.spawn(np.array([[10.0, 20.0], [199.0, 50.0]]), np.ones((2, 2)))
+    pool.draw()
+    pixels = pygame.surfarray.array3d(pool.screen)
+    assert (pixels[10:13, 20:23] == pool.color).all()
+    assert (pixels[199, 50:53] == pool.color).all()
+    assert (pixels[13, 20] == 0).all()
@@ -0,0 +1,85 @@
+# test_recorder.py
+
+import numpy as np
+import pytest
+
+import headless
+from game_logic import CompetitiveGameOfLife
+from headless import seed_board
+from recorder import TRAILER, GenerationRecorder, ReplayReader, apply_delta, encode_delta
+
+
+def record_run(path, generations=40, keyframe_every=7):
+    """
+    Record a seeded soup and return the grid at every generation, for comparison.
+    """
+    game = CompetitiveGameOfLife(60, 40, engine="numpy", seed=2)
+    seed_board(game, "soup", 0.4)
+    frames = [game.grid.copy()]
+    with GenerationRecorder(path, keyframe_every) as recorder:
+        game.record_to(recorder)
+        for _ in range(generations):
+            game.update_grid(False)
+            frames.append(game.grid.copy())
+    return frames
+
+
+def test_delta_round_trip():
+    rng = np.random.default_rng(0)
+    previous = rng.integers(0, 1000, (30, 20)).astype("<u2")
+    current = previous.copy()
+    current.ravel()[rng.choice(current.size, 50, replace=False)] = 999
+    grid = previous.copy()
+    apply_delta(grid, encode_delta(previous, current))
+    np.testing.assert_array_equal(grid, current)
+
+
+def test_seek_any_generation(tmp_path):
+    frames = record_run(tmp_path / "run.rec")
+    with ReplayReader(tmp_path / "run.rec") as reader:
+        assert reader.keyframes == list(range(0, 41, 7))
+        # Keyframes, the deltas right after and before one, and out of order
+        for generation in (0, 7, 8, 13, 40, 3, 22, 1):
+            found, grid = reader.seek(generation)
+            assert found == generation
+            np.testing.assert_array_equal(grid, frames[generation])
+        found, grid = reader.seek(1000)  # Past the end: the last frame
+        assert found == 40
+        np.testing.assert_array_equal(grid, frames[40])
+
+
+def test_iterate_every_frame(tmp_path):
+    frames = record_run(tmp_path / "run.rec")
+    with ReplayReader(tmp_path / "run.rec") as reader:
+        replayed = [(generation, grid.copy()) for generation, grid in reader]
+    assert [generation for generation, _ in replayed] == list(range(41))
+    for (_, grid), frame in zip(replayed, frames):
+        np.testing.assert_array_equal(grid, frame)
+
+
+def test_seek_without_index(tmp_path):
+    """
+    A recording whose writer never closed is indexed by scanning it.
+    """
+    path = tmp_path / "run.rec"
+    frames = record_run(path)
+    data = path.read_bytes()
+    index_offset, _, _ = TRAILER.unpack(data[-TRAILER.size:])
+    path.write_bytes(data[:index_offset - 5])  # Drop the index and half of the last record
+    with ReplayReader(path) as reader:
+        assert reader.keyframes == list(range(0, 40, 7))
+        found, grid = reader.seek(40)
+        assert found == 39
+        np.testing.assert_array_equal(grid, frames[39])
+
+
+def test_headless_recording(tmp_path):
+    path = tmp_path / "run.rec"
+    headless.run(48, 32, 25, seed=4, record=str(path), keyframe_every=10)
+    game = CompetitiveGameOfLife(48, 32, seed=4)
+    seed_board(game, "random", 0.3)
+    game.advance(17)
+    with ReplayReader(path) as reader:
+        np.testing.assert_array_equal(reader.seek(17)[1], game.grid)
+        with pytest.raises(ValueError):
+            reader.seek(-1)